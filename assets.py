@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+class AssetManager:
+    """Images and sounds decoded on a thread pool and cached by name.
+
+    image()/sound() queue a file and return at once; get() returns the
+    asset, or None while it is still loading or if it failed to load, so
+    callers fall back to their no-asset drawing until it arrives. Images
+    are decoded and scaled on the pool and converted to the display format
+    on the main thread the first time they are fetched.
+    """
+
+    def __init__(self, workers=4):
+        self.workers = workers
+        self.load_times = {}      # name -> decode time in milliseconds
+        self.errors = {}          # name -> exception
+        self._executor = None
+        self._futures = {}
+        self._assets = {}
+        self._started = time.perf_counter()
+        self._finished = None
+
+    def _submit(self, name, load, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='assets')
+        self._futures[name] = self._executor.submit(self._timed, name, load, *args)
+
+    def _timed(self, name, load, *args):
+        start = time.perf_counter()
+        asset = load(*args)
+        self._finished = time.perf_counter()
+        self.load_times[name] = (self._finished - start) * 1000
+        return asset
+
+    @staticmethod
+    def _load_image(path, size):
+        image = pygame.image.load(path)
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        return image
+
+    def image(self, name, path, size=None):
+        """Queue an image, optionally scaled to ``size``"""
+        self._submit(name, self._load_image, path, size)
+
+    def sound(self, name, path):
+        """Queue a sound, fully decoded so playing it never touches the disk"""
+        self._submit(name, pygame.mixer.Sound, path)
+
+    def get(self, name, wait=False):
+        """The loaded asset, or None if it is not ready (unless ``wait``) or failed"""
+        if name in self._assets:
+            return self._assets[name]
+        future = self._futures.get(name)
+        if future is None or not (wait or future.done()):
+            return None
+        try:
+            asset = future.result()
+        except (pygame.error, OSError) as e:
+            self.errors[name] = e
+            asset = None
+        if isinstance(asset, pygame.Surface):
+            asset = asset.convert_alpha()
+        self._assets[name] = asset
+        del self._futures[name]
+        return asset
+
+    def pending(self):
+        """Number of queued assets that have not finished loading"""
+        return sum(1 for future in self._futures.values() if not future.done())
+
+    def loaded(self):
+        """Number of assets finished (successfully or not)"""
+        return len(self._assets) + len(self._futures) - self.pending()
+
+    def wait(self):
+        """Block until every queued asset is loaded"""
+        for name in list(self._futures):
+            self.get(name, wait=True)
+
+    def report(self):
+        """Lines describing per-asset decode times and failures"""
+        lines = [f"{name}: {ms:.1f} ms" for name, ms in sorted(self.load_times.items(), key=lambda item: -item[1])]
+        lines += [f"{name}: failed ({error})" for name, error in self.errors.items()]
+        if self._finished is not None and not self.pending():
+            lines.append(f"all assets ready {(self._finished - self._started) * 1000:.1f} ms after queueing")
+        return lines
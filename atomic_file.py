@@ -0,0 +1,40 @@
+import os
+import stat
+import tempfile
+
+
+def copy_mode(path, temp_path):
+    """Give ``temp_path`` the permissions of ``path`` (0644 if it does not exist yet)
+
+    mkstemp creates files readable only by their owner, which os.replace
+    would otherwise carry over to the file being replaced.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o644
+    os.chmod(temp_path, mode)
+
+
+def write_atomic(path, text, prefix='.tmp-'):
+    """Replace ``path`` with ``text`` so that readers see either the old or the new file.
+
+    The text goes to a temporary file in the same directory, which is
+    fsynced, given the old file's permissions and renamed over ``path``.
+    Raises OSError on failure, after removing the temporary file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=prefix, suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        copy_mode(path, temp_path)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,151 @@
+"""Batch simulator for balance sweeps over the level tables.
+
+Fans seeded headless games out over a process pool and aggregates survival
+time, score, max combo and boss-kill rate per configuration:
+
+    python batch.py --games 100000 --configs sweep.json --out results.json
+
+``sweep.json`` holds a list of configurations. Each may override any of the
+level tables in simulation.balance_tables plus ``upgrades``, and may carry
+a ``name`` for the report:
+
+    [{"name": "baseline"},
+     {"name": "fast", "fall_speeds": [5, 7, 9, 11, 13], "upgrades": {"speed": 2}}]
+
+Games are handed to workers in chunks so inter-process traffic stays small
+and throughput scales with the number of cores.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from simulation import balance_tables, default_upgrades, run_headless  # noqa: E402
+
+
+def split_config(config):
+    """Split a sweep entry into (name, level table overrides, upgrades)"""
+    tables = {}
+    upgrades = default_upgrades()
+    for key, value in config.items():
+        if key == 'name':
+            continue
+        if key == 'upgrades':
+            unknown = set(value) - set(upgrades)
+            if unknown:
+                raise ValueError(f"Unknown upgrades: {', '.join(sorted(unknown))}")
+            upgrades.update(value)
+        elif key in balance_tables:
+            tables[key] = value
+        else:
+            raise ValueError(f"Unknown configuration key: {key}")
+    return config.get('name'), tables, upgrades
+
+
+def run_chunk(config, seeds, max_ticks):
+    """Worker entry point: play one game per seed and return their stats"""
+    _, tables, upgrades = split_config(config)
+    results = []
+    for seed in seeds:
+        stats = run_headless(seed=seed, max_ticks=max_ticks, config=tables, upgrades=dict(upgrades))
+        del stats['elapsed'], stats['ticks_per_second']
+        results.append(stats)
+    return results
+
+
+def summarize(name, results):
+    """Aggregate per-game stats for one configuration"""
+    ticks = [r['ticks'] for r in results]
+    scores = [r['score'] for r in results]
+    combos = [r['max_combo'] for r in results]
+    bosses_faced = sum(r['bosses_faced'] for r in results)
+    boss_kills = sum(r['boss_kills'] for r in results)
+    outcomes = {}
+    for r in results:
+        outcomes[r['outcome']] = outcomes.get(r['outcome'], 0) + 1
+    return {
+        'name': name,
+        'games': len(results),
+        'survival_seconds_mean': statistics.fmean(ticks) / 60,
+        'survival_seconds_median': statistics.median(ticks) / 60,
+        'score_mean': statistics.fmean(scores),
+        'level_mean': statistics.fmean(r['level'] for r in results),
+        'max_combo_mean': statistics.fmean(combos),
+        'max_combo_best': max(combos),
+        'bosses_faced': bosses_faced,
+        'boss_kills': boss_kills,
+        'boss_kill_rate': boss_kills / bosses_faced if bosses_faced else 0.0,
+        'outcomes': outcomes,
+    }
+
+
+def run_batch(configs, games, seed=0, max_ticks=60 * 60 * 30, workers=None, chunk_size=64):
+    """Play ``games`` seeded games for every configuration on a process pool.
+
+    Every configuration uses the same seeds so differences between them come
+    from the tables, not the dice. Returns (summaries, total ticks).
+    """
+    seeds = list(range(seed, seed + games))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    results = [[] for _ in configs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for index, config in enumerate(configs):
+            for chunk in chunks:
+                futures[pool.submit(run_chunk, config, chunk, max_ticks)] = index
+        for future in as_completed(futures):
+            results[futures[future]].extend(future.result())
+
+    summaries = []
+    for index, config in enumerate(configs):
+        name = config.get('name') or f"config {index}"
+        summaries.append(summarize(name, results[index]))
+    total_ticks = sum(r['ticks'] for config_results in results for r in config_results)
+    return summaries, total_ticks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run seeded headless games in parallel for balance sweeps")
+    parser.add_argument('--configs', help="JSON file with a list of configurations (default: the shipped tables)")
+    parser.add_argument('--games', type=int, default=1000, help="games per configuration")
+    parser.add_argument('--seed', type=int, default=0, help="first seed")
+    parser.add_argument('--ticks', type=int, default=60 * 60 * 30, help="tick limit per game")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=64, help="games per worker task")
+    parser.add_argument('--out', help="write the summaries to this JSON file")
+    args = parser.parse_args(argv)
+
+    configs = [{'name': 'default'}]
+    if args.configs:
+        with open(args.configs, 'r') as f:
+            configs = json.load(f)
+    for config in configs:
+        split_config(config)  # Fail fast on typos before starting the pool
+
+    start = time.perf_counter()
+    summaries, total_ticks = run_batch(configs, args.games, seed=args.seed, max_ticks=args.ticks,
+                                       workers=args.workers, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'config':<20} {'games':>7} {'survive s':>10} {'score':>7} {'level':>6} "
+          f"{'combo':>6} {'best':>5} {'boss kill':>9}")
+    for s in summaries:
+        print(f"{s['name']:<20} {s['games']:>7} {s['survival_seconds_mean']:>10.1f} {s['score_mean']:>7.1f} "
+              f"{s['level_mean']:>6.2f} {s['max_combo_mean']:>6.1f} {s['max_combo_best']:>5} "
+              f"{s['boss_kill_rate']:>9.1%}")
+    total_games = args.games * len(configs)
+    print(f"{total_games} games, {total_ticks} ticks in {elapsed:.1f}s "
+          f"({total_games / elapsed:.0f} games/s, {total_ticks / elapsed:.0f} ticks/s)")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'games_per_config': args.games, 'seed': args.seed,
+                       'configs': configs, 'summaries': summaries}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
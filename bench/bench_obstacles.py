@@ -0,0 +1,68 @@
+"""Simulation tick benchmark: step() cost at a fixed number of live obstacles.
+
+Run from the repository root:
+
+    python bench/bench_obstacles.py [--ticks 600] [--counts 10 100 1000 10000]
+
+Each scenario fills the obstacle store with slowly falling blocks of every
+type spread over the screen, makes the player effectively invulnerable and
+reports the p50/p99 time of a headless step() with the autopilot driving.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import simulation  # noqa: E402
+from simulation import GameState, autopilot, obstacle_types, screen_width, step  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench_step(live, ticks, seed=1):
+    """Tick times (ms) with ``live`` obstacles on screen"""
+    never = 10 ** 9
+    config = {'winning_scores': [never], 'spawn_delays': [never], 'max_blocks_per_level': [never],
+              'max_levels': 1}
+    upgrades = simulation.default_upgrades()
+    upgrades['lives'] = never
+    state = GameState(seed=seed, config=config, upgrades=upgrades, effects=False)
+    rng = random.Random(seed)
+    state.blocks.clear()
+    for _ in range(live):
+        kind = rng.choice(obstacle_types)
+        state.blocks.spawn(x=rng.uniform(0, screen_width - 80), y=rng.uniform(-80, 300), kind=kind,
+                           speed=0.05, size=70, bounce=rng.choice([-1, 1]) if kind == 'bouncy' else 0)
+
+    times = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        step(state, autopilot(state))
+        times.append((time.perf_counter() - start) * 1000)
+    return times, len(state.blocks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=600)
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 1000, 5000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'target':>7} {'live':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for live in args.counts:
+        times, final = bench_step(live, args.ticks)
+        steady = times[30:] or times
+        print(f"{live:>7} {final:>7} {percentile(steady, 50):>8.3f} "
+              f"{percentile(steady, 99):>8.3f} {max(steady):>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Particle benchmark: update and draw time at a sustained number of live particles.
+
+Run from the repository root:
+
+    python bench/bench_particles.py [--frames 600] [--counts 1000 5000 10000]
+
+Each scenario keeps the requested number of particles alive by re-emitting
+40-particle glow bursts (the ultimate-clear pattern) and reports the number
+actually live at the end and the p50/p99 time per frame of:
+
+  pool     the NumPy pool's update step
+  draw     game.draw_particles() onto the game screen (SDL's dummy video
+           driver), with the pool updated outside the timing
+  legacy   the old dict-per-particle update, for comparison
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root)
+
+from particles import ParticlePool  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bursts(live, frames, burst=40, life=30):
+    """Burst sizes to emit on each tick so that ``live`` particles are alive after the update.
+
+    A particle emitted with ``life`` survives ``life - 1`` updates, so
+    ``live / (life - 1)`` particles are needed per tick; the fractional part
+    is carried over to the next tick, and the last burst of a tick may be
+    smaller than ``burst``.
+    """
+    rate = live / (life - 1)
+    owed = 0.0
+    for _ in range(frames):
+        owed += rate
+        count = int(owed)
+        owed -= count
+        yield [min(burst, count - emitted) for emitted in range(0, count, burst)]
+
+
+def bench_pool(live, frames):
+    """Frame times (ms) for the NumPy pool holding ``live`` particles"""
+    pool = ParticlePool(capacity=max(8192, live * 2), gravity=0.2, seed=1)
+    times = []
+    for sizes in bursts(live, frames):
+        start = time.perf_counter()
+        for size in sizes:
+            pool.emit(400, 300, (255, 200, 0), size, (5, 10), glow=True)
+        pool.update()
+        times.append((time.perf_counter() - start) * 1000)
+    return times, len(pool)
+
+
+def bench_draw(live, frames):
+    """Frame times (ms) for drawing ``live`` particles with the game's renderer"""
+    os.chdir(root)  # game.py loads its assets from relative paths
+    import game  # Imported here: it opens the (dummy) display and loads every asset
+    game.particles = ParticlePool(capacity=max(8192, live * 2), gravity=0.2, seed=1)
+    game.sparkles.count = 0
+    times = []
+    for sizes in bursts(live, frames):
+        for size in sizes:
+            game.particles.emit(400, 300, (255, 200, 0), size, (5, 10), glow=True)
+        game.particles.update()
+        start = time.perf_counter()
+        game.draw_particles()
+        times.append((time.perf_counter() - start) * 1000)
+    return times, len(game.particles)
+
+
+def bench_legacy(live, frames):
+    """Frame times (ms) for the previous list-of-dicts implementation"""
+    particles = []
+    times = []
+    for sizes in bursts(live, frames):
+        start = time.perf_counter()
+        for size in sizes:
+            for _ in range(size):
+                angle = random.uniform(0, 2 * math.pi)
+                speed = random.uniform(5, 10)
+                particles.append({'x': 400, 'y': 300, 'vx': math.cos(angle) * speed,
+                                  'vy': math.sin(angle) * speed, 'life': 30,
+                                  'size': random.randint(2, 5)})
+        for p in particles[:]:
+            p['x'] += p['vx']
+            p['y'] += p['vy']
+            p['vy'] += 0.2
+            p['life'] -= 1
+            if p['life'] <= 0:
+                particles.remove(p)
+        times.append((time.perf_counter() - start) * 1000)
+    return times, len(particles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--skip-legacy', action='store_true', help="do not measure the old implementation")
+    parser.add_argument('--skip-draw', action='store_true', help="do not measure drawing")
+    args = parser.parse_args()
+
+    print(f"{'impl':<8} {'target':>7} {'live':>7} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for live in args.counts:
+        impls = [('pool', bench_pool)]
+        if not args.skip_draw:
+            impls.append(('draw', bench_draw))
+        if not args.skip_legacy:
+            impls.append(('legacy', bench_legacy))
+        for name, fn in impls:
+            times, final = fn(live, args.frames)
+            # Ignore the warm-up period before the pool reaches steady state
+            steady = times[30:] or times
+            print(f"{name:<8} {live:>7} {final:>7} {percentile(steady, 50):>8.3f} "
+                  f"{percentile(steady, 99):>8.3f} {max(steady):>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+"""Scripted stress scenarios for the game logic and renderer, checked against a baseline.
+
+Run from the repository root:
+
+    python bench/bench_suite.py [--frames 600] [--scenarios level5 boss_circle ...]
+    python bench/bench_suite.py --save-baseline     # record bench/baseline.json
+    python bench/bench_suite.py --replay FILE       # add a recorded run as a scenario
+
+Every scenario plays a seeded game through game.run_tick() and
+game.draw_game() on SDL's dummy video driver (assets are loaded, nothing is
+shown) and reports:
+
+  ticks/s         logic ticks per second (simulation, effects, background)
+  frame p50/p99   time of a whole frame: one tick, the draw and display.flip
+  alloc KB        mean peak of Python/NumPy memory allocated during a frame,
+                  from a separate tracemalloc pass (SDL surfaces not included)
+
+Each scenario runs --repeat times (default 3) and every metric is the median
+of the runs. Results are compared with the stored baseline and the script
+exits with status 1 when any metric is worse by more than --threshold
+(default 25%; ticks/s, which varies most between runs, may drop twice as
+much and p99 one and a half times as much). Baselines are machine specific:
+re-record them on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, root)
+os.chdir(root)  # game.py loads its assets from relative paths
+
+import pygame  # noqa: E402
+
+import game  # noqa: E402
+import replay  # noqa: E402
+import simulation  # noqa: E402
+from simulation import (  # noqa: E402
+    GameState, Inputs, autopilot, create_boss, max_ultimate_charge, no_input, obstacle_types,
+    power_up_duration, reset_level, screen_height, screen_width,
+)
+
+default_baseline = os.path.join('bench', 'baseline.json')
+
+# Metric name -> (True if higher is better, absolute change always tolerated,
+# multiple of --threshold allowed). A tick is a fraction of a millisecond, so
+# ticks/s swings more between runs than whole frames do.
+metrics = {
+    'ticks_per_sec': (True, 0.0, 2.0),
+    'frame_p50_ms': (False, 0.05, 1.0),
+    'frame_p99_ms': (False, 0.2, 1.5),
+    'alloc_kb_per_frame': (False, 1.0, 1.0),
+}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def new_state(seed):
+    """A run that never ends on its own: unreachable targets and effectively infinite lives"""
+    never = 10 ** 9
+    upgrades = simulation.default_upgrades()
+    upgrades['lives'] = never
+    return GameState(seed=seed, config={'winning_scores': [never] * simulation.max_levels},
+                     upgrades=upgrades)
+
+
+# Scenarios: setup(state) once, then tick(state, n) returns the inputs of tick n
+
+def level5_setup(state):
+    state.current_level = 5
+    reset_level(state)
+
+
+def level5_tick(state, n):
+    return autopilot(state)
+
+
+def boss_circle_setup(state):
+    create_boss(state)
+
+
+def boss_circle_tick(state, n):
+    # Keep the boss alive and on its circle pattern (8 blocks every second)
+    state.boss_pattern = 1
+    state.boss_health = state.boss_max_health
+    return autopilot(state)
+
+
+def ultimate_clear_setup(state):
+    pass
+
+
+def ultimate_clear_tick(state, n):
+    # Every second: fill the screen with blocks and clear them (40 particles per block)
+    if n % 60:
+        return no_input
+    rng = state.rng
+    for _ in range(20):
+        state.blocks.spawn(x=rng.randint(0, screen_width - 80), y=rng.randint(-80, screen_height - 200),
+                           kind=rng.choice(obstacle_types), speed=4, size=70)
+    state.ultimate_charge = max_ultimate_charge
+    state.ultimate_cooldown = 0
+    return Inputs(False, False, True)
+
+
+def power_ups_setup(state):
+    for power_type in ('shield', 'multiplier', 'speed'):
+        simulation.activate_power_up(state, power_type)
+
+
+def power_ups_tick(state, n):
+    for power_type in ('shield', 'multiplier', 'speed'):
+        state.active_power_ups[power_type] = power_up_duration
+    return autopilot(state)
+
+
+def particles_setup(state):
+    pass
+
+
+def particles_tick(state, n):
+    # Particles live 30 ticks: 34 new ones per tick keep about 1000 on screen
+    rng = state.rng
+    game.particles.emit(rng.randint(0, screen_width), rng.randint(0, screen_height), (255, 200, 0),
+                        34, (2, 6), life=30, size_range=(2, 5), glow=n % 2 == 0)
+    return autopilot(state)
+
+
+scenarios = {
+    'level5': (level5_setup, level5_tick),
+    'boss_circle': (boss_circle_setup, boss_circle_tick),
+    'ultimate_clear': (ultimate_clear_setup, ultimate_clear_tick),
+    'power_ups': (power_ups_setup, power_ups_tick),
+    'particles_1000': (particles_setup, particles_tick),
+}
+scenario_ticks = {}  # Scenarios that end after a number of ticks
+
+
+def add_replay(path):
+    """Register a recorded run as scenario 'replay:<file name>'; returns the scenario name"""
+    recorded = replay.load(path)
+    name = f"replay:{os.path.splitext(os.path.basename(path))[0]}"
+
+    def setup(state):
+        return recorded.new_state(effects=True)
+
+    def tick(state, n):
+        return recorded.tick_inputs(n)
+
+    scenarios[name] = (setup, tick)
+    scenario_ticks[name] = len(recorded)
+    return name
+
+
+def start(name, seed):
+    """Reset the game module to a fresh run of scenario ``name``"""
+    setup, tick = scenarios[name]
+    random.seed(seed)
+    game.particles.count = 0
+    game.sparkles.count = 0
+    game.player_trail.clear()
+    game.screen_shake = 0
+    game.flash_color = None
+    game.game_time = 0
+    game.frame_alpha = 1.0
+    state = new_state(seed)
+    game.state = setup(state) or state  # Replays bring their own state
+    game.save_positions()
+    return tick
+
+
+def frame(tick, n):
+    """Play one frame of the scenario (one tick, fully drawn); returns the logic time"""
+    start_time = time.perf_counter()
+    game.run_tick(tick(game.state, n))
+    logic = time.perf_counter() - start_time
+    game.draw_game()
+    pygame.display.flip()
+    return logic
+
+
+def run_scenario(name, frames, warmup, seed=1):
+    if name in scenario_ticks:
+        length = scenario_ticks[name]
+        warmup = min(warmup, length // 4)
+        frames = min(frames, length - warmup)
+    tick = start(name, seed)
+    logic_times = []
+    frame_times = []
+    for n in range(warmup + frames):
+        start_time = time.perf_counter()
+        logic = frame(tick, n)
+        if n >= warmup:
+            frame_times.append((time.perf_counter() - start_time) * 1000)
+            logic_times.append(logic)
+
+    # Allocation pass, separate because tracemalloc slows everything down
+    tick = start(name, seed)
+    for n in range(warmup):
+        frame(tick, n)
+    alloc_frames = max(1, min(frames, 120))
+    peaks = []
+    tracemalloc.start()
+    for n in range(warmup, warmup + alloc_frames):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        frame(tick, n)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    return {
+        'ticks_per_sec': len(logic_times) / sum(logic_times),
+        'frame_p50_ms': percentile(frame_times, 50),
+        'frame_p99_ms': percentile(frame_times, 99),
+        'frame_max_ms': max(frame_times),
+        'alloc_kb_per_frame': sum(peaks) / len(peaks) / 1024,
+        'blocks': len(game.state.blocks),
+        'particles': len(game.particles) + len(game.sparkles),
+    }
+
+
+def median_result(results):
+    """Per-metric median of several runs of one scenario"""
+    return {key: statistics.median(result[key] for result in results) for key in results[0]}
+
+
+def compare(results, baseline, threshold):
+    """Return a list of regression messages (empty when everything is within the threshold)"""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        for metric, (higher_is_better, tolerance, scale) in metrics.items():
+            if metric not in reference:
+                continue
+            old, new = reference[metric], result[metric]
+            worse = old - new if higher_is_better else new - old
+            if worse > tolerance and worse > abs(old) * threshold * scale:
+                regressions.append(f"{name}: {metric} {old:.3f} -> {new:.3f} "
+                                   f"({worse / abs(old) * 100 if old else float('inf'):.0f}% worse)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--warmup', type=int, default=60, help="frames ignored at the start of each scenario")
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(scenarios), default=list(scenarios))
+    parser.add_argument('--replay', nargs='+', default=[], help="replay files to run as extra scenarios")
+    parser.add_argument('--baseline', default=default_baseline)
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed fraction a metric may get worse before failing")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="runs per scenario; each metric is the median of the runs")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the baseline")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    names = args.scenarios + [add_replay(path) for path in args.replay]
+    results = {}
+    width = max(16, *(len(name) for name in names))
+    print(f"{'scenario':<{width}} {'ticks/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'alloc KB':>9}")
+    for name in names:
+        runs = [run_scenario(name, args.frames, args.warmup) for _ in range(max(1, args.repeat))]
+        result = results[name] = median_result(runs)
+        print(f"{name:<{width}} {result['ticks_per_sec']:>9.0f} {result['frame_p50_ms']:>8.3f} "
+              f"{result['frame_p99_ms']:>8.3f} {result['frame_max_ms']:>8.3f} "
+              f"{result['alloc_kb_per_frame']:>9.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r') as f:
+                stored = json.load(f).get('scenarios', {})
+        stored.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({'machine': {'python': platform.python_version(), 'pygame': pygame.version.ver,
+                                   'platform': platform.platform(), 'frames': args.frames,
+                                   'repeat': args.repeat},
+                       'scenarios': stored}, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; record one with --save-baseline")
+        return 0
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)['scenarios']
+    regressions = compare(results, baseline, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if regressions:
+        return 1
+    print(f"No regressions over {args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+import pygame
+
+
+class EffectLayers:
+    """Overlay effects drawn without allocating surfaces per frame.
+
+    Glows and rings are drawn on a persistent screen-sized overlay that is
+    blitted and then cleared only within their bounding box, instead of on
+    new full-screen surfaces. Ellipses and rectangles are textures rendered
+    once per shape and color at full opacity; each frame only their surface
+    alpha changes. The flash reuses one screen-sized surface that is
+    refilled only when its color changes.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.overlay = pygame.Surface(size, pygame.SRCALPHA)
+        self._flash = None
+        self._flash_color = None
+        self._textures = {}
+        self.renders = 0          # Textures rendered (each one is kept)
+
+    def _texture(self, key, render):
+        texture = self._textures.get(key)
+        if texture is None:
+            texture = self._textures[key] = render()
+            self.renders += 1
+        return texture
+
+    def glow(self, surface, center, discs):
+        """Concentric filled circles, (radius, color, alpha) in drawing order; returns the area drawn.
+
+        Rather than blending each circle over the screen, every ring between
+        two radii gets the single color and alpha that the circles covering
+        it blend to, so the overlay is filled once and blended once.
+        """
+        outer = max(radius for radius, _, _ in discs)
+        area = pygame.Rect(center[0] - outer, center[1] - outer, outer * 2 + 1, outer * 2 + 1)
+        area = area.clip(self.overlay.get_rect())
+        if not area:
+            return area
+        for radius in sorted({radius for radius, _, _ in discs}, reverse=True):
+            color = self._composite([(c, alpha) for r, c, alpha in discs if r >= radius])
+            pygame.draw.circle(self.overlay, color, center, radius)
+        return self._composite_overlay(surface, area)
+
+    @staticmethod
+    def _composite(layers):
+        """RGBA equal to blending (color, alpha) layers over a background in order"""
+        keep = 1.0                # Share of the background left visible
+        rgb = [0.0, 0.0, 0.0]
+        for color, alpha in layers:
+            alpha /= 255.0
+            rgb = [channel * (1 - alpha) + value * alpha for channel, value in zip(rgb, color)]
+            keep *= 1 - alpha
+        if keep >= 1:
+            return (0, 0, 0, 0)
+        return tuple(round(channel / (1 - keep)) for channel in rgb) + (round((1 - keep) * 255),)
+
+    def _composite_overlay(self, surface, area):
+        drawn = surface.blit(self.overlay, area.topleft, area)
+        self.overlay.fill((0, 0, 0, 0), area)
+        return drawn
+
+    def ellipse(self, surface, rect, color, alpha, width=0):
+        """Ellipse filling ``rect`` (outlined when ``width`` > 0) at ``alpha``; returns the area drawn"""
+        rect = pygame.Rect(rect)
+
+        def render():
+            texture = pygame.Surface(rect.size, pygame.SRCALPHA)
+            pygame.draw.ellipse(texture, color, texture.get_rect(), width)
+            return texture
+        texture = self._texture(('ellipse', rect.size, tuple(color), width), render)
+        texture.set_alpha(alpha)
+        return surface.blit(texture, rect.topleft)
+
+    def rect(self, surface, rect, color, alpha):
+        """Filled rectangle of ``color`` at ``alpha``; returns the area drawn"""
+        rect = pygame.Rect(rect)
+
+        def render():
+            texture = pygame.Surface(rect.size, pygame.SRCALPHA)
+            texture.fill(color)
+            return texture
+        texture = self._texture(('rect', rect.size, tuple(color)), render)
+        texture.set_alpha(alpha)
+        return surface.blit(texture, rect.topleft)
+
+    def rings(self, surface, center, radii, color, alpha, width):
+        """Concentric ring outlines of one color and alpha; returns the area drawn.
+
+        The rings must not overlap: they are drawn onto the shared overlay
+        and composited with a single blit of their bounding box.
+        """
+        outer = max(radii)
+        area = pygame.Rect(center[0] - outer, center[1] - outer, outer * 2 + 1, outer * 2 + 1)
+        area = area.clip(self.overlay.get_rect())
+        if not area:
+            return area
+        for radius in radii:
+            pygame.draw.circle(self.overlay, (*color, alpha), center, radius, width)
+        return self._composite_overlay(surface, area)
+
+    def flash(self, surface, color):
+        """Tint the whole of ``surface`` with an RGBA color"""
+        color = tuple(color)
+        if self._flash is None:
+            self._flash = pygame.Surface(self.size, pygame.SRCALPHA)
+        if color != self._flash_color:
+            self._flash.fill(color)
+            self._flash_color = color
+        return surface.blit(self._flash, (0, 0))
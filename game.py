@@ -1,50 +1,86 @@
+import itertools
 import pygame
 import random
 import time
 import math
-import json
 import os
+import sys
+import numpy as np
+
+from assets import AssetManager
+from effects import EffectLayers
+from gc_policy import GcPolicy
+from highscores import HighScoreStore
+try:
+    from history import RunHistory
+except ImportError:  # Python built without sqlite3: the JSON leaderboard still works
+    RunHistory = None
+from particles import ParticlePool
+from pools import Confetti, Pool
+from profile_store import ProfileStore
+from profiler import FrameProfiler
+from replay import ReplayWriter
+from sprite_cache import SpriteCache
+from starfield import Starfield
+from trail import PlayerTrail
+from ui import DirtyRectRenderer, GradientBar, Hud, TextCache
+from simulation import (
+    GameState, Inputs, step, headless_main, default_upgrades, default_achievements,
+    screen_width, screen_height, player_width, player_height,
+    max_lives, max_ultimate_charge, obstacle_types, power_up_pool,
+)
+
+# Headless mode: dummy SDL drivers, no assets, no rendering, no frame throttling
+HEADLESS = '--headless' in sys.argv or os.environ.get('DODGE_HEADLESS') == '1'
+if HEADLESS:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+# Uncapped mode: render as fast as the display allows (logic still runs at tick_rate)
+UNCAPPED = '--uncapped' in sys.argv or os.environ.get('DODGE_UNCAPPED') == '1'
+
+# Profile dump: write the frame profiler's timings to this path (.csv or .json) on exit
+PROFILE_OUT = os.environ.get('DODGE_PROFILE_OUT')
+if '--profile-out' in sys.argv[:-1]:
+    PROFILE_OUT = sys.argv[sys.argv.index('--profile-out') + 1]
+
+# Replay recording: stream every run's inputs to a file in this directory (replay with --replay FILE)
+RECORD_DIR = os.environ.get('DODGE_RECORD_DIR')
+if '--record' in sys.argv[:-1]:
+    RECORD_DIR = sys.argv[sys.argv.index('--record') + 1]
+
+# Background star count (raise it for large displays)
+STAR_COUNT = int(os.environ.get('DODGE_STARS', 100))
+if '--stars' in sys.argv[:-1]:
+    STAR_COUNT = int(sys.argv[sys.argv.index('--stars') + 1])
 
 # Initialize Pygame
 pygame.init()
 pygame.mixer.init()
 
-# Try to load sounds, handle if missing
-try:
-    hit_sound = pygame.mixer.Sound("sounds/hit.ogg")
-except:
-    hit_sound = None
-
-try:
-    celebration_music = pygame.mixer.Sound("sounds/celebration.wav")
-except:
-    celebration_music = None
-
-# Screen dimensions and setup
-screen_width, screen_height = 800, 600
+# Screen setup
 screen = pygame.display.set_mode((screen_width, screen_height))
 pygame.display.set_caption("Dodge the Falling Blocks - Ultimate Edition")
 
-# Player setup
-player_width, player_height = 250, 150
-player_x = (screen_width - player_width) // 2
-player_y = screen_height - player_height - 10
-base_player_speed = 10
-player_speed = base_player_speed
-player_rect = pygame.Rect(player_x, player_y, player_width, player_height)
-
-# Load images
-try:
-    rock_image = pygame.image.load("images/rock.png").convert_alpha()
-    rock_image = pygame.transform.scale(rock_image, (80, 80))
-except:
-    rock_image = None
-
-try:
-    player_image = pygame.image.load("images/icon.png").convert_alpha()
-    player_image = pygame.transform.scale(player_image, (player_width, player_height))
-except:
-    player_image = None
+# Sounds and images load in the background; assets.get(name) is None until
+# one is ready (or if it is missing) and drawing falls back to shapes
+assets = AssetManager(workers=4)
+if not HEADLESS:
+    assets.sound('hit', "sounds/hit.ogg")
+    assets.sound('celebration', "sounds/celebration.wav")
+    assets.sound('background', "sounds/background.wav")
+    assets.image('rock', "images/rock.png", (80, 80))
+    assets.image('player', "images/icon.png", (player_width, player_height))
+ASSET_REPORT = '--asset-report' in sys.argv
+
+# Garbage collection: frozen after loading, paused while a level is played and
+# run between levels (--default-gc keeps Python's normal behaviour)
+gc_policy = GcPolicy(enabled='--default-gc' not in sys.argv)
+POOL_REPORT = '--pool-report' in sys.argv
+
+# Background music loops on its own channel and keeps playing across levels
+pygame.mixer.set_reserved(1)
+music_channel = pygame.mixer.Channel(0)
 
 # Define colors
 background_color = (10, 15, 25)  # Very dark blue
@@ -61,344 +97,192 @@ clock = pygame.time.Clock()
 
 # Game state
 game_state = "menu"  # menu, playing, boss, game_over, shop
-current_level = 1
-max_levels = 5
-player_score = 0
-player_lives = 3
-max_lives = 3
-combo = 0
-max_combo = 0
+state = None  # GameState of the current run, see simulation.py
+player_run = None  # The player's own run (state may be swapped for another one, e.g. by the benchmarks)
+run_upgrades = {}  # Upgrade levels player_run started with (the shop changes the shared dict)
+
+# Progression that carries over between runs, persisted in profile_file.
+# The profile is read in the background and copied in by load_profile().
+profile_file = "profile.journal"
+profile = ProfileStore(profile_file)
+profile.preload()
 coins = 0
-total_score = 0
-winning_scores = [15, 25, 40, 60, 80]
-fall_speeds = [4, 6, 8, 10, 12]
-spawn_delays = [100, 80, 60, 45, 35]
-max_blocks_per_level = [15, 25, 35, 45, 55]
-
-# High score system
+upgrades = default_upgrades()
+achievements = default_achievements()
+profile_loaded = False
+
+def load_profile():
+    """Take coins, upgrades and achievements from the saved profile (once)"""
+    global coins, upgrades, achievements, profile_loaded
+    if profile_loaded:
+        return
+    saved = profile.load()
+    coins = saved['coins']
+    upgrades = saved['upgrades']
+    achievements = saved['achievements']
+    profile_loaded = True
+
+def save_profile():
+    """Journal any change to coins, upgrades or achievements (written in the background)"""
+    if profile_loaded:
+        profile.save(coins=coins, upgrades=upgrades, achievements=achievements)
+
+# High score system: best score/combo and the top runs, loaded on first use and saved in the background
 high_score_file = "highscore.json"
+high_scores = HighScoreStore(high_score_file, max_entries=10)
 
-def load_high_score():
-    """Load high score from file"""
-    try:
-        if os.path.exists(high_score_file):
-            with open(high_score_file, 'r') as f:
-                data = json.load(f)
-                return data.get('high_score', 0), data.get('max_combo', 0)
-    except:
-        pass
-    return 0, 0
-
-def save_high_score(score, combo):
-    """Save high score to file"""
-    try:
-        data = {'high_score': score, 'max_combo': combo}
-        with open(high_score_file, 'w') as f:
-            json.dump(data, f)
-    except:
-        pass
-
-high_score, high_combo = load_high_score()
-
-# Power-up system
-power_ups = []
-power_up_types = ['shield', 'speed', 'slow_motion', 'multiplier', 'ultimate']
-active_power_ups = {}
-power_up_spawn_timer = 0
-power_up_spawn_delay = 600
-
-# Ultimate ability system
-ultimate_charge = 0
-max_ultimate_charge = 100
-ultimate_active = False
-ultimate_duration = 0
-ultimate_cooldown = 0
+# Run history: every finished run in SQLite, paged through on the high scores screen
+run_history_file = "runs.db"
+run_history = RunHistory(run_history_file) if RunHistory else None
+leaderboard_page_size = 10
 
 # Particle system
-particles = []
-sparkles = []  # Additional sparkle effects
+particles = ParticlePool(capacity=8192, gravity=0.2)
+sparkles = ParticlePool(capacity=4096, drag=0.95)  # Additional sparkle effects
+
+# Pooled victory confetti
+confetti_pool = Pool(Confetti, prefill=150)
 
 # Player trail system
-player_trail = []
+player_trail = PlayerTrail(length=15)
 
 # Parallax background stars
-stars = []
-for _ in range(100):
-    stars.append({
-        'x': random.randint(0, screen_width),
-        'y': random.randint(0, screen_height),
-        'speed': random.uniform(0.5, 2),
-        'size': random.randint(1, 3),
-        'layer': random.randint(1, 3)
-    })
+stars = Starfield(STAR_COUNT, screen_width, screen_height)
 
 # Screen shake
 screen_shake = 0
 shake_intensity = 0
 
+# Full-screen flash requested by the game logic, drawn on the next frame
+flash_color = None
+
+# Reusable overlay surfaces and textures for the ultimate, shield, speed and flash effects
+effect_layers = EffectLayers((screen_width, screen_height))
+
 # Screen transitions
 transition_alpha = 0
 transition_type = None  # 'fade_in', 'fade_out', None
 
 # Glow effects
 glow_particles = []
+glow_sprites = SpriteCache(max_entries=1024)  # Pre-rendered glow/halo sprites
+rock_sprites = SpriteCache(max_entries=512, angle_step=4)  # Rock image per obstacle size and angle
+
+# Pre-rendered gradient bars
+ultimate_colors = ((200, 100, 255), (150, 150, 255))  # Purple while charging
+boss_health_bar = GradientBar(300, 25, (255, 50, 50), (127.5, 150, 50))
+health_bar = GradientBar(200, 20, (255, 100, 100), (155, 200, 100))
+ultimate_bar = GradientBar(200, 15, *ultimate_colors)
 
 # Combo display
 combo_display_time = 0
 combo_scale = 1.0
 
-# Obstacle types
-obstacle_types = ['normal', 'fast', 'slow', 'bouncy', 'splitter', 'homing']
-
-# Boss system
-boss_active = False
-boss_health = 0
-boss_max_health = 0
-boss_x = screen_width // 2
-boss_y = -100
-boss_pattern = 0
-boss_timer = 0
-
-# Upgrades
-upgrades = {
-    'speed': 0,
-    'lives': 0,
-    'ultimate_charge_rate': 0,
-    'coin_multiplier': 0
+# Fonts
+font_size = 36
+big_font_size = 72
+small_font_size = 24
+tiny_font_size = 18
+# Fonts per size (including the animated combo sizes) and rendered text surfaces
+text_cache = TextCache(sizes=(tiny_font_size, small_font_size, big_font_size) + tuple(range(36, 48)))
+
+# HUD widgets, each bound to a value and redrawn only when it changes (see build_hud).
+# The bars are a layer of their own so their pulsing glows go between them and the text.
+hud_bars = Hud((screen_width, screen_height))
+hud = Hud((screen_width, screen_height))
+power_up_names = {
+    'shield': 'Shield',
+    'speed': 'Speed Boost',
+    'slow_motion': 'Slow Motion',
+    'multiplier': 'Score x2'
 }
 
-# Achievements
-achievements = {
-    'first_combo_10': False,
-    'first_combo_50': False,
-    'first_boss_defeated': False,
-    'perfect_level': False,
-    'high_score_100': False
-}
+# Time tracking (drives animations; the simulation keeps its own tick count)
+game_time = 0
 
-# Fonts
-font = pygame.font.Font(None, 36)
-big_font = pygame.font.Font(None, 72)
-small_font = pygame.font.Font(None, 24)
-tiny_font = pygame.font.Font(None, 18)
+# Fixed timestep: logic runs at tick_rate whatever the frame rate, catching up
+# at most max_ticks_per_frame ticks per frame after a slow one
+tick_rate = 60
+tick_seconds = 1.0 / tick_rate
+max_ticks_per_frame = 5
 
-# Time tracking
-game_time = 0
-invulnerability_time = 0
-invulnerability_duration = 60
+# Interpolation between the last two ticks for drawing
+frame_alpha = 1.0
+prev_player_x = 0
+prev_boss_pos = None
+
+# Frame profiler: per-phase timings of the last frames, overlay toggled with F3
+profiler = FrameProfiler(history=600)
+show_profiler = False
+profiler_lines = []
+profiler_panel = None
+profiler_refresh = 30  # Frames between overlay updates
+
+# Replay writer of the current run (only with RECORD_DIR)
+recorder = None
 
 def create_particles(x, y, color, count=10, speed_range=(2, 5), particle_type='normal'):
     """Create particle explosion effect with enhanced visuals"""
-    for _ in range(count):
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(speed_range[0], speed_range[1])
-        particles.append({
-            'x': x,
-            'y': y,
-            'vx': math.cos(angle) * speed,
-            'vy': math.sin(angle) * speed,
-            'color': color,
-            'life': 30,
-            'size': random.randint(2, 5),
-            'type': particle_type,
-            'glow': random.choice([True, False]) if particle_type == 'glow' else False
-        })
+    particles.emit(x, y, color, count, speed_range, life=30, size_range=(2, 5),
+                   glow=particle_type == 'glow')
     
     # Add sparkles for special effects
     if particle_type == 'glow' or count > 20:
-        for _ in range(count // 3):
-            sparkles.append({
-                'x': x,
-                'y': y,
-                'vx': random.uniform(-3, 3),
-                'vy': random.uniform(-3, 3),
-                'life': 20,
-                'size': random.randint(3, 6),
-                'color': (255, 255, 255)
-            })
+        sparkles.scatter(x, y, (255, 255, 255), count // 3, spread=3, life=20, size_range=(3, 6))
 
 def update_particles():
-    """Update and remove dead particles"""
-    global particles, sparkles
-    for p in particles[:]:
-        p['x'] += p['vx']
-        p['y'] += p['vy']
-        p['vy'] += 0.2
-        p['life'] -= 1
-        if p['life'] <= 0:
-            particles.remove(p)
-    
-    for s in sparkles[:]:
-        s['x'] += s['vx']
-        s['y'] += s['vy']
-        s['vx'] *= 0.95
-        s['vy'] *= 0.95
-        s['life'] -= 1
-        if s['life'] <= 0:
-            sparkles.remove(s)
+    """Update particles and compact away dead ones"""
+    particles.update()
+    sparkles.update()
+
+def particle_blits(pool, fade, glows=True):
+    """Iterator of (sprite, position) for the live particles of ``pool``, each glowing one preceded by its glow.
+
+    Alpha is ``life * fade``; a glow is a circle of twice the size at a
+    third of the alpha. Everything is computed on the pool's arrays and the
+    sprites are looked up once per distinct circle.
+    """
+    x, y, size, life, color, glow = pool.arrays()
+    n = len(x)
+    if n == 0:
+        return iter(())
+    # Items 2i and 2i + 1 are particle i's glow and the particle itself
+    keep = np.ones(2 * n, dtype=bool)
+    keep[0::2] = glow if glows else False
+    radii = np.repeat(size.astype(np.int32), 2)
+    radii[0::2] *= 2
+    radii = radii[keep]
+    alphas = np.repeat(np.minimum(255, life.astype(np.int32) * fade), 2)
+    alphas[0::2] //= 3
+    sprites = glow_sprites.circles(radii, np.repeat(color, 2, axis=0)[keep], alphas[keep])
+    left = (np.repeat(x.astype(np.int32), 2)[keep] - radii).tolist()   # Truncated like int()
+    top = (np.repeat(y.astype(np.int32), 2)[keep] - radii).tolist()
+    return zip(sprites, zip(left, top))
 
 def draw_particles():
-    """Draw all particles with enhanced glow effects"""
-    for p in particles:
-        alpha = min(255, p['life'] * 8)
-        base_color = p['color'][:3] if len(p['color']) >= 3 else p['color']
-        
-        # Enhanced glow effect
-        if p.get('glow', False) or p.get('type') == 'glow':
-            # Draw outer glow
-            glow_size = p['size'] * 2
-            glow_alpha = alpha // 3
-            glow_surface = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (*base_color, glow_alpha), (glow_size, glow_size), glow_size)
-            screen.blit(glow_surface, (int(p['x']) - glow_size, int(p['y']) - glow_size))
-        
-        # Draw main particle
-        particle_surface = pygame.Surface((p['size'] * 2, p['size'] * 2), pygame.SRCALPHA)
-        pygame.draw.circle(particle_surface, (*base_color, alpha), (p['size'], p['size']), p['size'])
-        screen.blit(particle_surface, (int(p['x']) - p['size'], int(p['y']) - p['size']))
-    
-    # Draw sparkles
-    for s in sparkles:
-        sparkle_alpha = min(255, s['life'] * 12)
-        sparkle_surface = pygame.Surface((s['size'] * 2, s['size'] * 2), pygame.SRCALPHA)
-        pygame.draw.circle(sparkle_surface, (*s['color'], sparkle_alpha), (s['size'], s['size']), s['size'])
-        screen.blit(sparkle_surface, (int(s['x']) - s['size'], int(s['y']) - s['size']))
+    """Draw all particles with enhanced glow effects, then the sparkles, in one blit call"""
+    screen.blits(itertools.chain(particle_blits(particles, 8), particle_blits(sparkles, 12, glows=False)), False)
 
 def update_stars():
     """Update parallax stars"""
-    global stars
-    for star in stars:
-        star['y'] += star['speed'] * (0.3 if 'slow_motion' in active_power_ups else 1.0)
-        if star['y'] > screen_height:
-            star['y'] = 0
-            star['x'] = random.randint(0, screen_width)
+    stars.update(0.3 if state is not None and 'slow_motion' in state.active_power_ups else 1.0)
 
 def draw_stars():
-    """Draw parallax stars with twinkling effect"""
-    for star in stars:
-        brightness = min(255, 150 + star['layer'] * 50)
-        # Twinkling effect
-        twinkle = int(20 * math.sin(game_time * 0.05 + star['x'] * 0.01 + star['y'] * 0.01))
-        final_brightness = min(255, max(100, brightness + twinkle))
-        color = (final_brightness, final_brightness, final_brightness)
-        
-        # Draw star with glow for larger stars
-        if star['size'] >= 2:
-            glow_surface = pygame.Surface((star['size'] * 3, star['size'] * 3), pygame.SRCALPHA)
-            glow_alpha = final_brightness // 3
-            pygame.draw.circle(glow_surface, (*color, glow_alpha), 
-                             (star['size'] * 1.5, star['size'] * 1.5), star['size'] * 1.5)
-            screen.blit(glow_surface, (int(star['x']) - star['size'] * 1.5, 
-                                      int(star['y']) - star['size'] * 1.5))
-        
-        pygame.draw.circle(screen, color, (int(star['x']), int(star['y'])), star['size'])
+    """Draw parallax stars with twinkling effect; returns the areas drawn"""
+    return stars.draw(screen, game_time)
 
 def update_player_trail():
-    """Update player trail effect"""
-    global player_trail
-    # Add current position to trail
-    player_trail.append({
-        'x': player_rect.centerx,
-        'y': player_rect.centery,
-        'life': 15
-    })
-    # Update and remove old trail
-    for trail in player_trail[:]:
-        trail['life'] -= 1
-        if trail['life'] <= 0:
-            player_trail.remove(trail)
+    """Add the player's position to the trail (once per tick)"""
+    player_trail.push(state.player_rect.centerx, state.player_rect.centery)
 
 def draw_player_trail():
     """Draw player trail with enhanced glow"""
-    for i, trail in enumerate(player_trail):
-        alpha = int(255 * (trail['life'] / 15))
-        size = int(20 * (trail['life'] / 15))
-        if player_image:
-            # Draw faded player image with glow
-            trail_surface = pygame.Surface((player_width + 10, player_height + 10), pygame.SRCALPHA)
-            trail_surface.set_alpha(alpha // 4)
-            trail_surface.blit(player_image, (5, 5))
-            screen.blit(trail_surface, (trail['x'] - player_width // 2 - 5, trail['y'] - player_height // 2 - 5))
-            
-            # Main trail
-            trail_surface = pygame.Surface((player_width, player_height), pygame.SRCALPHA)
-            trail_surface.set_alpha(alpha // 2)
-            trail_surface.blit(player_image, (0, 0))
-            screen.blit(trail_surface, (trail['x'] - player_width // 2, trail['y'] - player_height // 2))
-        else:
-            # Enhanced circle trail with glow
-            glow_size = size * 1.5
-            glow_surface = pygame.Surface((int(glow_size * 2), int(glow_size * 2)), pygame.SRCALPHA)
-            pygame.draw.circle(glow_surface, (0, 255, 0, alpha // 4), (int(glow_size), int(glow_size)), int(glow_size))
-            screen.blit(glow_surface, (int(trail['x']) - int(glow_size), int(trail['y']) - int(glow_size)))
-            
-            trail_surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(trail_surface, (0, 255, 0, alpha), (size, size), size)
-            screen.blit(trail_surface, (int(trail['x']) - size, int(trail['y']) - size))
-
-def create_power_up():
-    """Create a random power-up"""
-    power_type = random.choice(power_up_types)
-    power_ups.append({
-        'x': random.randint(50, screen_width - 50),
-        'y': -30,
-        'type': power_type,
-        'size': 30,
-        'rotation': 0,
-        'pulse': 0
-    })
-
-def update_power_ups():
-    """Update power-up positions and check collisions"""
-    global power_ups, active_power_ups, player_speed, player_lives, combo, ultimate_charge
-    for power in power_ups[:]:
-        power['y'] += 3
-        power['rotation'] += 2
-        power['pulse'] += 0.1
-        
-        power_rect = pygame.Rect(power['x'] - power['size']//2, power['y'] - power['size']//2,
-                                 power['size'], power['size'])
-        if player_rect.colliderect(power_rect):
-            if power['type'] == 'ultimate':
-                ultimate_charge = min(max_ultimate_charge, ultimate_charge + 25)
-            else:
-                activate_power_up(power['type'])
-            create_particles(power['x'], power['y'], (255, 255, 0), 30, (3, 8), 'glow')
-            power_ups.remove(power)
-        
-        if power['y'] > screen_height + 50:
-            power_ups.remove(power)
+    player_trail.set_image(assets.get('player'))
+    player_trail.draw(screen)
 
-def activate_power_up(power_type):
-    """Activate a power-up effect"""
-    global active_power_ups, player_speed, player_lives
-    duration = 300
-    
-    if power_type == 'shield':
-        active_power_ups['shield'] = duration
-        if player_lives < max_lives:
-            player_lives = min(max_lives, player_lives + 1)
-    elif power_type == 'speed':
-        active_power_ups['speed'] = duration
-        player_speed = (base_player_speed + upgrades['speed']) * 1.8
-    elif power_type == 'slow_motion':
-        active_power_ups['slow_motion'] = duration
-    elif power_type == 'multiplier':
-        active_power_ups['multiplier'] = duration
-
-def update_active_power_ups():
-    """Update active power-up timers"""
-    global active_power_ups, player_speed
-    for power_type in list(active_power_ups.keys()):
-        active_power_ups[power_type] -= 1
-        if active_power_ups[power_type] <= 0:
-            del active_power_ups[power_type]
-            if power_type == 'speed':
-                player_speed = base_player_speed + upgrades['speed']
-
-def draw_power_up(power):
-    """Draw a power-up with enhanced glow and animation"""
-    size = power['size'] + int(math.sin(power['pulse']) * 5)
+def draw_power_up(power, x, y):
+    """Draw a power-up at (x, y) with enhanced glow and animation"""
+    size = power.size + int(math.sin(power.pulse) * 5)
     color_map = {
         'shield': (100, 200, 255),
         'speed': (255, 200, 100),
@@ -406,137 +290,40 @@ def draw_power_up(power):
         'multiplier': (255, 255, 100),
         'ultimate': (255, 100, 255)
     }
-    color = color_map.get(power['type'], (255, 255, 255))
+    color = color_map.get(power.type, (255, 255, 255))
     
     # Draw outer glow
     glow_size = size + 10
-    glow_surface = pygame.Surface((glow_size * 2, glow_size * 2), pygame.SRCALPHA)
-    glow_alpha = int(100 + 100 * math.sin(power['pulse'] * 2))
-    glow_points = []
-    for i in range(6):
-        angle = (power['rotation'] + i * 60) * math.pi / 180
-        px = glow_size + math.cos(angle) * glow_size // 2
-        py = glow_size + math.sin(angle) * glow_size // 2
-        glow_points.append((px, py))
-    pygame.draw.polygon(glow_surface, (*color, glow_alpha // 2), glow_points)
-    screen.blit(glow_surface, (power['x'] - glow_size, power['y'] - glow_size))
+    glow_alpha = int(100 + 100 * math.sin(power.pulse * 2))
+    glow_surface = glow_sprites.hexagon(glow_size // 2, color, glow_alpha // 2, power.rotation)
+    half = glow_surface.get_width() // 2
+    screen.blit(glow_surface, (x - half, y - half))
     
     # Draw main power-up
     points = []
     for i in range(6):
-        angle = (power['rotation'] + i * 60) * math.pi / 180
-        px = power['x'] + math.cos(angle) * size // 2
-        py = power['y'] + math.sin(angle) * size // 2
+        angle = (power.rotation + i * 60) * math.pi / 180
+        px = x + math.cos(angle) * size // 2
+        py = y + math.sin(angle) * size // 2
         points.append((px, py))
     pygame.draw.polygon(screen, color, points)
     pygame.draw.polygon(screen, (255, 255, 255), points, 2)
     
     # Draw center glow
-    center_glow = pygame.Surface((size, size), pygame.SRCALPHA)
-    pygame.draw.circle(center_glow, (*color, 150), (size // 2, size // 2), size // 3)
-    screen.blit(center_glow, (power['x'] - size // 2, power['y'] - size // 2))
-
-def activate_ultimate():
-    """Activate ultimate ability"""
-    global ultimate_active, ultimate_duration, ultimate_charge, ultimate_cooldown
-    if ultimate_charge >= max_ultimate_charge and ultimate_cooldown <= 0:
-        ultimate_active = True
-        ultimate_duration = 180  # 3 seconds
-        ultimate_charge = 0
-        ultimate_cooldown = 300  # 5 second cooldown
-        # Clear all obstacles on screen with enhanced effect
-        for block in blocks[:]:
-            create_particles(block['x'] + block['size']//2, block['y'] + block['size']//2,
-                           (255, 200, 0), 40, (5, 10), 'glow')
-            blocks.remove(block)
-        add_screen_shake(15)
-        
-        # Create screen-wide flash
-        flash_surface = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-        pygame.draw.rect(flash_surface, (255, 255, 200, 100), (0, 0, screen_width, screen_height))
-        screen.blit(flash_surface, (0, 0))
-
-def create_obstacle():
-    """Create a random obstacle with type"""
-    obstacle_type = random.choice(obstacle_types)
-    return {
-        'x': random.randint(0, screen_width - 80),
-        'y': -80,
-        'type': obstacle_type,
-        'speed': fall_speeds[current_level - 1] + (2 if obstacle_type == 'fast' else -1 if obstacle_type == 'slow' else 0),
-        'rotation': 0,
-        'bounce': 0 if obstacle_type != 'bouncy' else random.choice([-1, 1]),
-        'size': 60 if obstacle_type == 'slow' else 80 if obstacle_type == 'fast' else 70,
-        'homing_target': None if obstacle_type != 'homing' else (player_rect.centerx, player_rect.centery)
-    }
-
-def update_obstacle_homing(block):
-    """Update homing obstacle to track player"""
-    if block['type'] == 'homing' and block['y'] > 0:
-        target_x, target_y = player_rect.centerx, player_rect.centery
-        dx = target_x - block['x']
-        dy = target_y - block['y']
-        distance = math.sqrt(dx*dx + dy*dy)
-        if distance > 0:
-            block['x'] += (dx / distance) * 2
-            block['x'] = max(0, min(screen_width - block['size'], block['x']))
-
-def create_boss():
-    """Create a boss for the level"""
-    global boss_active, boss_health, boss_max_health, boss_x, boss_y, boss_pattern, boss_timer
-    boss_active = True
-    boss_max_health = 50 + current_level * 20
-    boss_health = boss_max_health
-    boss_x = screen_width // 2
-    boss_y = 50
-    boss_pattern = 0
-    boss_timer = 0
-
-def update_boss():
-    """Update boss behavior and attacks"""
-    global boss_health, boss_x, boss_y, boss_pattern, boss_timer, blocks, boss_active
-    
-    if not boss_active:
-        return
-    
-    boss_timer += 1
-    
-    # Boss movement pattern
-    boss_x = screen_width // 2 + math.sin(boss_timer * 0.05) * 200
-    
-    # Boss attack patterns
-    if boss_timer % 60 == 0:  # Every second
-        # Spawn obstacles in patterns
-        if boss_pattern == 0:  # Spread pattern
-            for i in range(5):
-                blocks.append({
-                    'x': boss_x + (i - 2) * 100,
-                    'y': boss_y + 50,
-                    'type': 'fast',
-                    'speed': 8,
-                    'rotation': 0,
-                    'bounce': 0,
-                    'size': 60
-                })
-        elif boss_pattern == 1:  # Circle pattern
-            for i in range(8):
-                angle = (i / 8) * 2 * math.pi
-                blocks.append({
-                    'x': boss_x + math.cos(angle) * 100,
-                    'y': boss_y + math.sin(angle) * 100,
-                    'type': 'normal',
-                    'speed': 6,
-                    'rotation': 0,
-                    'bounce': 0,
-                    'size': 50
-                })
-        boss_pattern = (boss_pattern + 1) % 2
+    center_radius = size // 3
+    center_glow = glow_sprites.circle(center_radius, color, 150)
+    screen.blit(center_glow, (x - center_radius, y - center_radius))
 
 def draw_boss():
     """Draw the boss with enhanced visual effects"""
-    if not boss_active:
+    if not state.boss_active:
         return
     
+    boss_x, boss_y = state.boss_x, state.boss_y
+    if prev_boss_pos:
+        boss_x = lerp(prev_boss_pos[0], boss_x, frame_alpha)
+        boss_y = lerp(prev_boss_pos[1], boss_y, frame_alpha)
+    
     # Boss body
     boss_size = 120
     pulse = int(math.sin(game_time * 0.3) * 10)
@@ -546,9 +333,7 @@ def draw_boss():
     for i in range(3):
         glow_radius = boss_size//2 + pulse + (i * 15)
         glow_alpha = 100 - (i * 30)
-        glow_surface = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
-        glow_color = (255, 50 + i * 20, 50 + i * 20, glow_alpha)
-        pygame.draw.circle(glow_surface, glow_color, (glow_radius, glow_radius), glow_radius)
+        glow_surface = glow_sprites.circle(glow_radius, (255, 50 + i * 20, 50 + i * 20), glow_alpha)
         screen.blit(glow_surface, (int(boss_x) - glow_radius, int(boss_y) - glow_radius))
     
     # Main boss body with multiple layers
@@ -568,8 +353,7 @@ def draw_boss():
         particle_x = boss_x + math.cos(angle) * (boss_size//2 + 20)
         particle_y = boss_y + math.sin(angle) * (boss_size//2 + 20)
         particle_alpha = int(150 + 100 * math.sin(game_time * 0.3 + i))
-        particle_surface = pygame.Surface((10, 10), pygame.SRCALPHA)
-        pygame.draw.circle(particle_surface, (255, 200, 0, particle_alpha), (5, 5), 5)
+        particle_surface = glow_sprites.circle(5, (255, 200, 0), particle_alpha)
         screen.blit(particle_surface, (int(particle_x) - 5, int(particle_y) - 5))
     
     # Enhanced health bar with glow
@@ -584,53 +368,28 @@ def draw_boss():
     screen.blit(bar_glow, (bar_x - 2, bar_y - 2))
     
     pygame.draw.rect(screen, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
-    health_width = int(bar_width * (boss_health / boss_max_health))
+    health_width = int(bar_width * (state.boss_health / state.boss_max_health))
     
     # Gradient health bar
-    if health_width > 0:
-        health_surface = pygame.Surface((health_width, bar_height), pygame.SRCALPHA)
-        for i in range(health_width):
-            ratio = i / health_width
-            r = int(255 * (1 - ratio * 0.5))
-            g = int(50 + ratio * 100)
-            b = 50
-            pygame.draw.line(health_surface, (r, g, b), (i, 0), (i, bar_height))
-        screen.blit(health_surface, (bar_x, bar_y))
+    boss_health_bar.draw(screen, bar_x, bar_y, health_width)
     
     pygame.draw.rect(screen, (255, 255, 255), (bar_x, bar_y, bar_width, bar_height), 2)
     
     # Boss text with glow
-    boss_text = font.render("BOSS", True, (255, 255, 255))
-    text_glow = font.render("BOSS", True, (255, 100, 100))
+    boss_text = text_cache.render(font_size, "BOSS", (255, 255, 255))
+    text_glow = text_cache.render(font_size, "BOSS", (255, 100, 100))
     screen.blit(text_glow, (screen_width // 2 - boss_text.get_width() // 2 + 2, bar_y + 30))
     screen.blit(boss_text, (screen_width // 2 - boss_text.get_width() // 2, bar_y + 28))
 
-def reset_level():
-    """Reset game variables for a new level"""
-    global blocks, spawn_timer, fall_speed, spawn_delay, max_blocks, power_ups, active_power_ups
-    global boss_active, boss_health, ultimate_charge, ultimate_active, ultimate_duration
-    blocks = []
-    power_ups = []
-    active_power_ups = {}
-    spawn_timer = 0
-    power_up_spawn_timer = 0
-    fall_speed = fall_speeds[current_level - 1]
-    spawn_delay = spawn_delays[current_level - 1]
-    max_blocks = max_blocks_per_level[current_level - 1]
-    boss_active = False
-    ultimate_charge = 0
-    ultimate_active = False
-    ultimate_duration = 0
-    for _ in range(3):
-        blocks.append(create_obstacle())
-
 def show_menu():
     """Display main menu with enhanced visuals"""
-    global game_state, current_level, player_score, player_lives, combo, max_combo, coins, total_score, game_time
+    global game_state, game_time
     
     menu_selected = 0
     menu_options = ["Start Game", "High Scores", "Upgrades", "Quit"]
     menu_time = 0
+    renderer = DirtyRectRenderer(screen)
+    static_key = None
     
     while game_state == "menu":
         menu_time += 1
@@ -646,72 +405,141 @@ def show_menu():
                     menu_selected = (menu_selected + 1) % len(menu_options)
                 elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
                     if menu_selected == 0:  # Start Game
-                        current_level = 1
-                        player_score = 0
-                        player_lives = max_lives + upgrades['lives']
-                        combo = 0
-                        max_combo = 0
-                        total_score = 0
-                        reset_level()
+                        start_new_game()
                         game_state = "playing"
+                        gc_policy.pause()
                         return True
                     elif menu_selected == 1:  # High Scores
                         show_high_scores()
+                        static_key = None
                     elif menu_selected == 2:  # Upgrades
                         show_upgrade_shop()
+                        static_key = None
                     elif menu_selected == 3:  # Quit
                         return False
         
+        # Static layer: everything but the title and the selected option
+        if static_key != menu_selected:
+            renderer.set_static(lambda surface: draw_menu_static(surface, menu_options, menu_selected))
+            static_key = menu_selected
+        
         # Draw menu
-        screen.fill(background_color)
+        renderer.begin()
         update_stars()
-        draw_stars()
+        renderer.mark(draw_stars())
         
         # Animated title with glow
         title_glow = int(20 * math.sin(menu_time * 0.1))
-        title = big_font.render("DODGE THE BLOCKS", True, (255, 255, 255))
-        title_glow_text = big_font.render("DODGE THE BLOCKS", True, (255, 200, 100))
-        screen.blit(title_glow_text, (screen_width // 2 - title.get_width() // 2 + title_glow, 
-                                     100 + title_glow))
-        screen.blit(title, (screen_width // 2 - title.get_width() // 2, 100))
-        
-        subtitle = font.render("Ultimate Edition", True, (200, 200, 255))
-        screen.blit(subtitle, (screen_width // 2 - subtitle.get_width() // 2, 180))
-        
-        # Enhanced menu options with selection indicator
-        for i, option in enumerate(menu_options):
-            if i == menu_selected:
-                # Selected option with glow and animation
-                scale = 1.0 + 0.1 * math.sin(menu_time * 0.2)
-                color = (255, 255, 100)
-                glow_color = (255, 200, 0)
-                # Draw glow
-                glow_text = font.render(option, True, glow_color)
-                screen.blit(glow_text, (screen_width // 2 - glow_text.get_width() // 2 + 2, 
-                                       250 + i * 60 + 2))
-                # Draw selection indicator
-                indicator_size = int(15 * scale)
-                pygame.draw.circle(screen, color, 
-                                 (screen_width // 2 - 100, 250 + i * 60 + 18), indicator_size)
-                pygame.draw.circle(screen, (255, 255, 255), 
-                                 (screen_width // 2 - 100, 250 + i * 60 + 18), indicator_size, 2)
-            else:
-                color = (200, 200, 200)
-            
-            option_text = font.render(option, True, color)
-            screen.blit(option_text, (screen_width // 2 - option_text.get_width() // 2, 250 + i * 60))
+        title = text_cache.render(big_font_size, "DODGE THE BLOCKS", (255, 255, 255))
+        title_glow_text = text_cache.render(big_font_size, "DODGE THE BLOCKS", (255, 200, 100))
+        renderer.blit(title_glow_text, (screen_width // 2 - title.get_width() // 2 + title_glow, 
+                                       100 + title_glow))
+        renderer.blit(title, (screen_width // 2 - title.get_width() // 2, 100))
         
-        hint = small_font.render("Use UP/DOWN arrows and ENTER to select", True, (150, 150, 150))
-        screen.blit(hint, (screen_width // 2 - hint.get_width() // 2, screen_height - 50))
+        # Selected option with glow and animation
+        i = menu_selected
+        option = menu_options[i]
+        scale = 1.0 + 0.1 * math.sin(menu_time * 0.2)
+        color = (255, 255, 100)
+        glow_color = (255, 200, 0)
+        # Draw glow
+        glow_text = text_cache.render(font_size, option, glow_color)
+        renderer.blit(glow_text, (screen_width // 2 - glow_text.get_width() // 2 + 2, 
+                                 250 + i * 60 + 2))
+        # Draw selection indicator
+        indicator_size = int(15 * scale)
+        renderer.mark([pygame.draw.circle(screen, color, 
+                                          (screen_width // 2 - 100, 250 + i * 60 + 18), indicator_size),
+                       pygame.draw.circle(screen, (255, 255, 255), 
+                                          (screen_width // 2 - 100, 250 + i * 60 + 18), indicator_size, 2)])
+        option_text = text_cache.render(font_size, option, color)
+        renderer.blit(option_text, (screen_width // 2 - option_text.get_width() // 2, 250 + i * 60))
         
-        pygame.display.flip()
+        renderer.present()
         clock.tick(60)
     
     return True
 
+def draw_menu_static(surface, menu_options, menu_selected):
+    """Draw the parts of the main menu that do not animate"""
+    surface.fill(background_color)
+    
+    subtitle = text_cache.render(font_size, "Ultimate Edition", (200, 200, 255))
+    surface.blit(subtitle, (screen_width // 2 - subtitle.get_width() // 2, 180))
+    
+    for i, option in enumerate(menu_options):
+        if i != menu_selected:
+            option_text = text_cache.render(font_size, option, (200, 200, 200))
+            surface.blit(option_text, (screen_width // 2 - option_text.get_width() // 2, 250 + i * 60))
+    
+    hint = text_cache.render(small_font_size, "Use UP/DOWN arrows and ENTER to select", (150, 150, 150))
+    surface.blit(hint, (screen_width // 2 - hint.get_width() // 2, screen_height - 50))
+
 def show_high_scores():
     """Show high scores screen"""
-    global game_state
+    
+    def draw_static(surface):
+        surface.fill(background_color)
+        
+        title = text_cache.render(big_font_size, "HIGH SCORES", (255, 255, 255))
+        surface.blit(title, (screen_width // 2 - title.get_width() // 2, 100))
+        
+        score_text = text_cache.render(font_size, f"Best Score: {high_scores.best_score}", (255, 255, 100))
+        surface.blit(score_text, (screen_width // 2 - score_text.get_width() // 2, 180))
+        
+        combo_text = text_cache.render(font_size, f"Best Combo: {high_scores.best_combo}x", (255, 255, 100))
+        surface.blit(combo_text, (screen_width // 2 - combo_text.get_width() // 2, 220))
+        
+        # One page of the leaderboard of all runs
+        columns = (130, 200, 300, 390, 480)
+        for x, heading in zip(columns, ("#", "Score", "Combo", "Level", "Date")):
+            heading_text = text_cache.render(small_font_size, heading, (150, 150, 200))
+            surface.blit(heading_text, (x, 262))
+        for i, entry in enumerate(entries):
+            date = time.localtime(entry.get('finished_at', entry.get('time', 0)))
+            values = (f"{first + i + 1}.", str(entry['score']), f"{entry['max_combo']}x",
+                      str(entry.get('level', '-')), time.strftime('%Y-%m-%d %H:%M', date))
+            for x, value in zip(columns, values):
+                value_text = text_cache.render(small_font_size, value, (220, 220, 220))
+                surface.blit(value_text, (x, 288 + i * 24))
+        if pages > 1:
+            page_text = text_cache.render(small_font_size, f"Page {page + 1}/{pages}", (150, 150, 200))
+            surface.blit(page_text, (screen_width // 2 - page_text.get_width() // 2, 535))
+        
+        hint = text_cache.render(small_font_size, "LEFT/RIGHT to change page, ESC or ENTER to return",
+                                 (150, 150, 150))
+        surface.blit(hint, (screen_width // 2 - hint.get_width() // 2, screen_height - 40))
+    
+    def load_page(number):
+        """Entries on leaderboard page ``number`` (the JSON top runs if SQLite is unavailable)"""
+        if run_history:
+            try:
+                return run_history.top(leaderboard_page_size, number * leaderboard_page_size)
+            except Exception:
+                pass
+        return high_scores.leaderboard()[number * leaderboard_page_size:(number + 1) * leaderboard_page_size]
+    
+    def count_pages():
+        total = len(high_scores.leaderboard())
+        if run_history:
+            try:
+                total = run_history.count()
+            except Exception:
+                pass
+        return max(1, -(-total // leaderboard_page_size))
+    
+    # Runs recorded just before opening the screen may still be queued: the
+    # writer is asked to commit them now and the page is reloaded once it has
+    catching_up = bool(run_history) and run_history.pending > 0
+    if catching_up:
+        run_history.flush(timeout=0)
+    pages = count_pages()
+    page = 0
+    first = 0
+    entries = load_page(page)
+    
+    renderer = DirtyRectRenderer(screen)
+    renderer.set_static(draw_static)
     waiting = True
     while waiting:
         for event in pygame.event.get():
@@ -720,30 +548,34 @@ def show_high_scores():
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE or event.key == pygame.K_RETURN:
                     waiting = False
+                elif event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                    step_by = -1 if event.key in (pygame.K_LEFT, pygame.K_PAGEUP) else 1
+                    new_page = min(pages - 1, max(0, page + step_by))
+                    if new_page != page:
+                        page = new_page
+                        first = page * leaderboard_page_size
+                        entries = load_page(page)
+                        renderer.set_static(draw_static)
         
-        screen.fill(background_color)
-        draw_stars()
-        
-        title = big_font.render("HIGH SCORES", True, (255, 255, 255))
-        screen.blit(title, (screen_width // 2 - title.get_width() // 2, 100))
-        
-        score_text = font.render(f"Best Score: {high_score}", True, (255, 255, 100))
-        screen.blit(score_text, (screen_width // 2 - score_text.get_width() // 2, 200))
-        
-        combo_text = font.render(f"Best Combo: {high_combo}x", True, (255, 255, 100))
-        screen.blit(combo_text, (screen_width // 2 - combo_text.get_width() // 2, 250))
-        
-        hint = small_font.render("Press ESC or ENTER to return", True, (150, 150, 150))
-        screen.blit(hint, (screen_width // 2 - hint.get_width() // 2, screen_height - 50))
+        if catching_up and run_history.pending == 0:
+            catching_up = False
+            pages = count_pages()
+            page = min(page, pages - 1)
+            first = page * leaderboard_page_size
+            entries = load_page(page)
+            renderer.set_static(draw_static)
         
-        pygame.display.flip()
+        renderer.begin()
+        renderer.mark(draw_stars())
+        renderer.present()
         clock.tick(60)
     
     return True
 
 def show_upgrade_shop():
     """Show upgrade shop"""
-    global game_state, coins, upgrades
+    global coins
+    load_profile()
     
     shop_selected = 0
     shop_options = [
@@ -753,6 +585,25 @@ def show_upgrade_shop():
         ("Coin Multiplier", upgrades['coin_multiplier'], 150, 'coin_multiplier')
     ]
     
+    def draw_static(surface):
+        surface.fill(background_color)
+        
+        title = text_cache.render(big_font_size, "UPGRADE SHOP", (255, 255, 255))
+        surface.blit(title, (screen_width // 2 - title.get_width() // 2, 50))
+        
+        coins_text = text_cache.render(font_size, f"Coins: {coins}", (255, 255, 100))
+        surface.blit(coins_text, (screen_width // 2 - coins_text.get_width() // 2, 120))
+        
+        for i, (name, level, cost, key) in enumerate(shop_options):
+            color = (255, 255, 100) if i == shop_selected else (200, 200, 200)
+            option_text = text_cache.render(font_size, f"{name} (Lv {level}) - {cost} coins", color)
+            surface.blit(option_text, (screen_width // 2 - option_text.get_width() // 2, 180 + i * 60))
+        
+        hint = text_cache.render(small_font_size, "Press ESC to return, ENTER to buy", (150, 150, 150))
+        surface.blit(hint, (screen_width // 2 - hint.get_width() // 2, screen_height - 50))
+    
+    renderer = DirtyRectRenderer(screen)
+    static_key = None
     waiting = True
     while waiting:
         for event in pygame.event.get():
@@ -770,25 +621,16 @@ def show_upgrade_shop():
                     if coins >= cost:
                         coins -= cost
                         upgrades[key] += 1
+                        save_profile()
         
-        screen.fill(background_color)
-        draw_stars()
-        
-        title = big_font.render("UPGRADE SHOP", True, (255, 255, 255))
-        screen.blit(title, (screen_width // 2 - title.get_width() // 2, 50))
-        
-        coins_text = font.render(f"Coins: {coins}", True, (255, 255, 100))
-        screen.blit(coins_text, (screen_width // 2 - coins_text.get_width() // 2, 120))
+        # The static layer only changes with the selection or a purchase
+        if static_key != (shop_selected, coins):
+            renderer.set_static(draw_static)
+            static_key = (shop_selected, coins)
         
-        for i, (name, level, cost, key) in enumerate(shop_options):
-            color = (255, 255, 100) if i == shop_selected else (200, 200, 200)
-            option_text = font.render(f"{name} (Lv {level}) - {cost} coins", True, color)
-            screen.blit(option_text, (screen_width // 2 - option_text.get_width() // 2, 180 + i * 60))
-        
-        hint = small_font.render("Press ESC to return, ENTER to buy", True, (150, 150, 150))
-        screen.blit(hint, (screen_width // 2 - hint.get_width() // 2, screen_height - 50))
-        
-        pygame.display.flip()
+        renderer.begin()
+        renderer.mark(draw_stars())
+        renderer.present()
         clock.tick(60)
     
     return True
@@ -797,14 +639,16 @@ def show_level_start():
     """Display level start message with enhanced visuals"""
     global game_time
     
-    try:
-        pygame.mixer.music.stop()
-        pygame.mixer.music.load("sounds/background.wav")
-        pygame.mixer.music.set_volume(0.1)
-        pygame.mixer.music.play(-1)
-    except:
-        pass
+    start_music()
+    gc_policy.collect()  # Between levels, behind a screen that is waiting for a key anyway
 
+    def draw_static(surface):
+        surface.fill(background_color)
+        target_text = text_cache.render(small_font_size, f"Target Score: {state.winning_scores[state.current_level - 1]}", (150, 150, 200))
+        surface.blit(target_text, (screen_width // 2 - target_text.get_width() // 2, screen_height // 2 + 70))
+    
+    renderer = DirtyRectRenderer(screen)
+    renderer.set_static(draw_static)
     start_time = 0
     waiting = True
     while waiting:
@@ -812,26 +656,23 @@ def show_level_start():
         game_time = start_time
         
         update_stars()
-        screen.fill(background_color)
-        draw_stars()
+        renderer.begin()
+        renderer.mark(draw_stars())
         
         # Animated level text
         pulse = int(15 * math.sin(start_time * 0.15))
-        level_text = big_font.render(f"Level {current_level}", True, (255, 255, 255))
-        level_glow = big_font.render(f"Level {current_level}", True, (100, 200, 255))
-        screen.blit(level_glow, (screen_width // 2 - level_text.get_width() // 2 + pulse, 
-                               screen_height // 2 - 80 + pulse))
-        screen.blit(level_text, (screen_width // 2 - level_text.get_width() // 2, screen_height // 2 - 80))
+        level_text = text_cache.render(big_font_size, f"Level {state.current_level}", (255, 255, 255))
+        level_glow = text_cache.render(big_font_size, f"Level {state.current_level}", (100, 200, 255))
+        renderer.blit(level_glow, (screen_width // 2 - level_text.get_width() // 2 + pulse, 
+                                 screen_height // 2 - 80 + pulse))
+        renderer.blit(level_text, (screen_width // 2 - level_text.get_width() // 2, screen_height // 2 - 80))
         
         # Blinking start text
         if (start_time // 30) % 2:
-            start_text = font.render("Press SPACE to start", True, (200, 200, 255))
-            screen.blit(start_text, (screen_width // 2 - start_text.get_width() // 2, screen_height // 2 + 20))
+            start_text = text_cache.render(font_size, "Press SPACE to start", (200, 200, 255))
+            renderer.blit(start_text, (screen_width // 2 - start_text.get_width() // 2, screen_height // 2 + 20))
         
-        target_text = small_font.render(f"Target Score: {winning_scores[current_level - 1]}", True, (150, 150, 200))
-        screen.blit(target_text, (screen_width // 2 - target_text.get_width() // 2, screen_height // 2 + 70))
-        
-        pygame.display.flip()
+        renderer.present()
         clock.tick(60)
         
         for event in pygame.event.get():
@@ -844,7 +685,7 @@ def show_level_start():
 
 def run_confetti(duration=3):
     """Enhanced confetti celebration"""
-    confetti_particles = []
+    confetti_particles = []  # Taken from confetti_pool and handed back when they fall out
     colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255), (0, 255, 255)]
     
     start_time = time.time()
@@ -859,36 +700,37 @@ def run_confetti(duration=3):
         
         if len(confetti_particles) < 150:
             for _ in range(5):
-                confetti_particles.append({
-                    'x': random.randint(0, screen_width),
-                    'y': -10,
-                    'color': random.choice(colors),
-                    'speed': random.uniform(2, 6),
-                    'rotation': random.uniform(0, 360),
-                    'rotation_speed': random.uniform(-5, 5),
-                    'size': random.randint(3, 8)
-                })
+                confetti_particles.append(confetti_pool.acquire(
+                    random.randint(0, screen_width), -10, random.choice(colors), random.uniform(2, 6),
+                    random.uniform(0, 360), random.uniform(-5, 5), random.randint(3, 8)))
 
         for p in confetti_particles[:]:
-            p['y'] += p['speed']
-            p['x'] += math.sin(p['rotation'] * math.pi / 180) * 2
-            p['rotation'] += p['rotation_speed']
-            pygame.draw.circle(screen, p['color'], (int(p['x']), int(p['y'])), p['size'])
+            p.y += p.speed
+            p.x += math.sin(p.rotation * math.pi / 180) * 2
+            p.rotation += p.rotation_speed
+            pygame.draw.circle(screen, p.color, (int(p.x), int(p.y)), p.size)
             
-            if p['y'] > screen_height:
+            if p.y > screen_height:
                 confetti_particles.remove(p)
+                confetti_pool.release(p)
 
         pygame.display.flip()
         clock.tick(60)
+    confetti_pool.release_all(confetti_particles)
+
+def start_music():
+    """Loop the background music unless it is already playing (it is decoded once and reused)"""
+    music = assets.get('background')
+    if music and music_channel.get_sound() is not music:
+        music_channel.set_volume(0.1)
+        music_channel.play(music, loops=-1)
 
 def play_celebration():
     """Play celebration sequence"""
-    try:
-        pygame.mixer.music.stop()
-        if celebration_music:
-            celebration_music.play()
-    except:
-        pass
+    music_channel.stop()
+    celebration_music = assets.get('celebration')
+    if celebration_music:
+        celebration_music.play()
     run_confetti()
 
 def add_screen_shake(intensity=5):
@@ -897,361 +739,339 @@ def add_screen_shake(intensity=5):
     screen_shake = 10
     shake_intensity = intensity
 
-def check_achievements():
-    """Check and unlock achievements"""
-    global achievements, high_score, high_combo, coins, combo, boss_active, boss_health, player_score
-    
-    if combo >= 10 and not achievements['first_combo_10']:
-        achievements['first_combo_10'] = True
-        coins += 10
-    
-    if combo >= 50 and not achievements['first_combo_50']:
-        achievements['first_combo_50'] = True
-        coins += 50
-    
-    if boss_active and boss_health <= 0 and not achievements['first_boss_defeated']:
-        achievements['first_boss_defeated'] = True
-        coins += 100
-    
-    if player_score >= 100 and not achievements['high_score_100']:
-        achievements['high_score_100'] = True
-        coins += 25
-
-# Initialize
-reset_level()
-if not show_menu():
-    running = False
-else:
-    running = True
-
-# Main game loop
-while running:
-    dt = clock.tick(60) / 16.67
-    game_time += 1
-    
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_q and game_state == "playing":
-                activate_ultimate()
-            elif event.key == pygame.K_ESCAPE:
-                game_state = "menu"
-                show_menu()
-
-    if game_state == "menu":
-        if not show_menu():
-            running = False
-        continue
-    
-    if game_state != "playing":
-        continue
-
-    # Handle player movement
-    keys = pygame.key.get_pressed()
-    move_speed = (player_speed + upgrades['speed']) * (0.5 if 'slow_motion' in active_power_ups else 1.0)
-    
-    if keys[pygame.K_LEFT] and player_rect.x > 0:
-        player_rect.x -= move_speed
-    if keys[pygame.K_RIGHT] and player_rect.x < screen_width - player_width:
-        player_rect.x += move_speed
-
-    # Update systems
-    if invulnerability_time > 0:
-        invulnerability_time -= 1
-    
-    if ultimate_active:
-        ultimate_duration -= 1
-        if ultimate_duration <= 0:
-            ultimate_active = False
-    
-    if ultimate_cooldown > 0:
-        ultimate_cooldown -= 1
-    
-    # Charge ultimate
-    if not ultimate_active and ultimate_charge < max_ultimate_charge:
-        charge_rate = 0.1 + upgrades['ultimate_charge_rate'] * 0.05
-        ultimate_charge = min(max_ultimate_charge, ultimate_charge + charge_rate)
-
-    # Update background
-    update_stars()
-    update_player_trail()
-
-    # Game logic
-    spawn_timer += 1
-    power_up_spawn_timer += 1
-
-    # Boss logic
-    if boss_active:
-        update_boss()
-    elif player_score >= winning_scores[current_level - 1] * 0.8 and not boss_active:
-        create_boss()
-
-    # Spawn obstacles (unless boss is active)
-    if not boss_active and spawn_timer >= spawn_delay:
-        blocks.append(create_obstacle())
-        spawn_timer = 0
-
-    # Spawn power-ups
-    if power_up_spawn_timer >= power_up_spawn_delay:
-        if random.random() < 0.3:
-            create_power_up()
-        power_up_spawn_timer = 0
-
-    # Update power-ups
-    update_power_ups()
-    update_active_power_ups()
-
-    # Remove obstacles off screen
-    blocks = [block for block in blocks if block['y'] < screen_height + 100]
-
-    if len(blocks) > max_blocks:
-        blocks.pop(0)
-
-    # Calculate fall speed
-    speed_multiplier = 0.5 if 'slow_motion' in active_power_ups else 1.0
-    if ultimate_active:
-        speed_multiplier *= 0.3  # Ultimate slows everything
-    current_fall_speed_multiplier = speed_multiplier * (1 + min(player_score * 0.02, 0.5))
-
-    # Update obstacle positions
-    for block in blocks:
-        block['y'] += block['speed'] * current_fall_speed_multiplier
-        block['rotation'] += 2
-        update_obstacle_homing(block)
-        
-        if block['type'] == 'bouncy':
-            block['x'] += block['bounce'] * 2
-            if block['x'] <= 0 or block['x'] >= screen_width - block['size']:
-                block['bounce'] *= -1
-
-    # Update particles
-    update_particles()
-
-    # Check collisions
-    for block in blocks[:]:
-        block_rect = pygame.Rect(block['x'], block['y'], block['size'], block['size'])
-
-        if block['y'] >= screen_height:
-            if not player_rect.colliderect(block_rect):
-                score_gain = 1
-                if 'multiplier' in active_power_ups:
-                    score_gain = 2
-                score_gain += upgrades['coin_multiplier']
-                player_score += score_gain
-                coins += score_gain
-                combo += 1
-                max_combo = max(max_combo, combo)
-                combo_display_time = 60
-                combo_scale = 1.3
-                check_achievements()
-                create_particles(block['x'] + block['size']//2, block['y'] + block['size']//2,
-                                (100, 255, 100), 10, (3, 7), 'glow')
-            blocks.remove(block)
-
-        if player_rect.colliderect(block_rect) and invulnerability_time <= 0 and not ultimate_active:
-            if 'shield' in active_power_ups:
-                del active_power_ups['shield']
-                create_particles(block['x'] + block['size']//2, block['y'] + block['size']//2,
-                                (100, 200, 255), 25, (4, 8), 'glow')
-            else:
-                if hit_sound:
-                    hit_sound.play()
-                player_lives -= 1
-                combo = 0
-                invulnerability_time = invulnerability_duration
-                add_screen_shake(8)
-                create_particles(block['x'] + block['size']//2, block['y'] + block['size']//2,
-                                (255, 100, 100), 30, (5, 10), 'glow')
-                
-                if player_lives <= 0:
-                    # Game over with enhanced visuals
-                    total_score = player_score
-                    if total_score > high_score:
-                        high_score = total_score
-                        save_high_score(high_score, max_combo)
-                    if max_combo > high_combo:
-                        high_combo = max_combo
-                        save_high_score(high_score, high_combo)
-                    
-                    # Create explosion effect
-                    for _ in range(50):
-                        create_particles(player_rect.centerx, player_rect.centery, 
-                                       (255, 100, 100), 1, (5, 10), 'glow')
-                    
-                    # Show game over screen
-                    wait_time = 0
-                    while wait_time < 180:  # 3 seconds at 60fps
-                        wait_time += 1
-                        update_particles()
-                        update_stars()
-                        
-                        screen.fill(background_color)
-                        draw_stars()
-                        draw_particles()
-                        
-                        # Pulsing game over text
-                        pulse = int(10 * math.sin(wait_time * 0.2))
-                        game_over_text = big_font.render("Game Over!", True, (255, 100, 100))
-                        game_over_glow = big_font.render("Game Over!", True, (255, 50, 50))
-                        screen.blit(game_over_glow, (screen_width // 2 - game_over_text.get_width() // 2 + pulse, 
-                                                     screen_height // 2 - 150 + pulse))
-                        screen.blit(game_over_text, (screen_width // 2 - game_over_text.get_width() // 2, 
-                                                   screen_height // 2 - 150))
-                        
-                        score_text = font.render(f"Final Score: {total_score}", True, (255, 255, 255))
-                        combo_text = font.render(f"Max Combo: {max_combo}x", True, (255, 255, 255))
-                        coins_text = font.render(f"Coins Earned: {coins}", True, (255, 255, 100))
-                        screen.blit(score_text, (screen_width // 2 - score_text.get_width() // 2, screen_height // 2 - 50))
-                        screen.blit(combo_text, (screen_width // 2 - combo_text.get_width() // 2, screen_height // 2))
-                        screen.blit(coins_text, (screen_width // 2 - coins_text.get_width() // 2, screen_height // 2 + 50))
-                        
-                        pygame.display.flip()
-                        clock.tick(60)
-                    
-                    game_state = "menu"
-                    continue
-            
-            blocks.remove(block)
-
-    # Boss collision and damage
-    if boss_active:
-        boss_rect = pygame.Rect(boss_x - 60, boss_y - 60, 120, 120)
-        if player_rect.colliderect(boss_rect) and invulnerability_time <= 0:
-            if 'shield' not in active_power_ups:
-                player_lives -= 1
-                invulnerability_time = invulnerability_duration
-                add_screen_shake(10)
-        
-        # Boss takes damage over time (survive long enough to win)
-        if game_time % 30 == 0:  # Every 0.5 seconds
-            boss_health -= 1
-        
-        # Boss takes extra damage from ultimate
-        if ultimate_active:
-            boss_health -= 2
-        
-        # Check if boss is defeated
-        if boss_health <= 0:
-            boss_active = False
-            coins += 50 + current_level * 10
-            player_score += 20  # Bonus for defeating boss
+def trigger_flash(color):
+    """Flash the whole screen with an RGBA color on the next frame"""
+    global flash_color
+    flash_color = color
+
+def start_new_game():
+    """Begin a fresh run at level 1 with the current upgrades and coins"""
+    global state, player_run, run_upgrades, screen_shake, flash_color, recorder
+    save_replay('quit')
+    load_profile()
+    # Everything loaded at startup lives until exit: keep it out of every collection
+    assets.wait()
+    gc_policy.freeze()
+    state = player_run = GameState(seed=random.randrange(2 ** 32), upgrades=upgrades,
+                                   achievements=achievements, coins=coins)
+    run_upgrades = dict(upgrades)
+    state.profiler = profiler
+    if RECORD_DIR:
+        os.makedirs(RECORD_DIR, exist_ok=True)
+        path = os.path.join(RECORD_DIR, f"replay-{time.strftime('%Y%m%d-%H%M%S')}-{state.seed}.dreplay")
+        recorder = ReplayWriter(path, state)
+    screen_shake = 0
+    flash_color = None
+    save_positions()
+
+def end_run():
+    """Keep the coins earned during the run for the upgrade shop"""
+    global coins
+    coins = state.coins
+    save_profile()
+    save_replay('quit')
+
+def save_replay(outcome):
+    """Finish the current run's replay file (once per run; runs with no ticks leave no file)"""
+    global recorder
+    if recorder is not None:
+        recorder.close(outcome)
+        recorder = None
+
+def apply_effects():
+    """Turn the effect events queued by the simulation into particles, shake and sound"""
+    global combo_display_time, combo_scale, coins
+    for effect in state.effects:
+        kind = effect[0]
+        if kind == 'particles':
+            create_particles(*effect[1:])
+        elif kind == 'shake':
+            add_screen_shake(effect[1])
+        elif kind == 'flash':
+            trigger_flash(effect[1])
+        elif kind == 'hit':
+            hit_sound = assets.get('hit')
+            if hit_sound:
+                hit_sound.play()
+        elif kind == 'combo':
+            combo_display_time = 60
+            combo_scale = 1.3
+        elif kind == 'achievement' and state is player_run:
+            # Unlocks are kept even if the run is abandoned (coins included)
+            coins = state.coins
+            save_profile()
+        elif kind == 'boss_defeated':
             # Massive explosion effect
+            boss_x, boss_y = effect[1], effect[2]
             for _ in range(5):
                 create_particles(boss_x + random.randint(-50, 50), 
                                boss_y + random.randint(-50, 50), 
                                (255, 200, 0), 30, (8, 15), 'glow')
-            add_screen_shake(20)
-            check_achievements()
-            
-            # Victory flash
-            flash_surface = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-            pygame.draw.rect(flash_surface, (255, 255, 100, 150), (0, 0, screen_width, screen_height))
-            screen.blit(flash_surface, (0, 0))
-
-    # Check level completion
-    if player_score >= winning_scores[current_level - 1] and not boss_active:
-        if current_level < max_levels:
-            current_level += 1
-            player_score = 0
-            player_lives = max_lives + upgrades['lives']
-            combo = 0
-            coins += 20
-            if not show_level_start():
-                game_state = "menu"
-            reset_level()
-        else:
-            play_celebration()
-            total_score = player_score
-            if total_score > high_score:
-                high_score = total_score
-                save_high_score(high_score, max_combo)
-            screen.fill(background_color)
-            draw_stars()
-            win_text = big_font.render("You Won All Levels!", True, (100, 255, 100))
-            score_text = font.render(f"Final Score: {total_score}", True, (255, 255, 255))
-            combo_text = font.render(f"Max Combo: {max_combo}x", True, (255, 255, 255))
-            screen.blit(win_text, (screen_width // 2 - win_text.get_width() // 2, screen_height // 2 - 100))
-            screen.blit(score_text, (screen_width // 2 - score_text.get_width() // 2, screen_height // 2))
-            screen.blit(combo_text, (screen_width // 2 - combo_text.get_width() // 2, screen_height // 2 + 50))
-            pygame.display.flip()
-            pygame.time.wait(3000)
-            game_state = "menu"
+    state.effects.clear()
+
+def record_high_score(outcome):
+    """Add the finished run to the leaderboard (written in the background)"""
+    seconds = round(state.tick / tick_rate, 2)  # Game time, the same in both stores
+    high_scores.record(state.total_score, state.max_combo, level=state.current_level, outcome=outcome,
+                       seconds=seconds, boss_kills=state.boss_kills, coins=state.coins)
+    if run_history:
+        run_history.record(state.total_score, state.max_combo, state.current_level, outcome,
+                           coins=state.coins, boss_kills=state.boss_kills, seconds=seconds,
+                           level_scores=state.level_scores + [state.player_score],
+                           upgrades=run_upgrades, seed=state.seed)
+
+def show_game_over():
+    """Show the game over screen with the final explosion"""
+    # Create explosion effect in a single vectorized burst
+    particles.emit(state.player_rect.centerx, state.player_rect.centery,
+                   (255, 100, 100), 50, (5, 10), glow=True)
+        
+    # Show game over screen
+    wait_time = 0
+    while wait_time < 180:  # 3 seconds at 60fps
+        wait_time += 1
+        update_particles()
+        update_stars()
+        
+        screen.fill(background_color)
+        draw_stars()
+        draw_particles()
+        
+        # Pulsing game over text
+        pulse = int(10 * math.sin(wait_time * 0.2))
+        game_over_text = text_cache.render(big_font_size, "Game Over!", (255, 100, 100))
+        game_over_glow = text_cache.render(big_font_size, "Game Over!", (255, 50, 50))
+        screen.blit(game_over_glow, (screen_width // 2 - game_over_text.get_width() // 2 + pulse, 
+                                     screen_height // 2 - 150 + pulse))
+        screen.blit(game_over_text, (screen_width // 2 - game_over_text.get_width() // 2, 
+                                   screen_height // 2 - 150))
+        
+        score_text = text_cache.render(font_size, f"Final Score: {state.total_score}", (255, 255, 255))
+        combo_text = text_cache.render(font_size, f"Max Combo: {state.max_combo}x", (255, 255, 255))
+        coins_text = text_cache.render(font_size, f"Coins Earned: {state.coins}", (255, 255, 100))
+        screen.blit(score_text, (screen_width // 2 - score_text.get_width() // 2, screen_height // 2 - 50))
+        screen.blit(combo_text, (screen_width // 2 - combo_text.get_width() // 2, screen_height // 2))
+        screen.blit(coins_text, (screen_width // 2 - coins_text.get_width() // 2, screen_height // 2 + 50))
+        
+        pygame.display.flip()
+        clock.tick(60)
 
+def show_victory():
+    """Show the celebration and final score after beating the last level"""
+    play_celebration()
+    screen.fill(background_color)
+    draw_stars()
+    win_text = text_cache.render(big_font_size, "You Won All Levels!", (100, 255, 100))
+    score_text = text_cache.render(font_size, f"Final Score: {state.total_score}", (255, 255, 255))
+    combo_text = text_cache.render(font_size, f"Max Combo: {state.max_combo}x", (255, 255, 255))
+    screen.blit(win_text, (screen_width // 2 - win_text.get_width() // 2, screen_height // 2 - 100))
+    screen.blit(score_text, (screen_width // 2 - score_text.get_width() // 2, screen_height // 2))
+    screen.blit(combo_text, (screen_width // 2 - combo_text.get_width() // 2, screen_height // 2 + 50))
+    pygame.display.flip()
+    pygame.time.wait(3000)
+
+def lerp(a, b, t):
+    return a + (b - a) * t
+
+def save_positions():
+    """Remember positions before a tick so frames between ticks can be interpolated"""
+    global prev_player_x, prev_boss_pos
+    state.blocks.snapshot()
+    prev_player_x = state.player_rect.x
+    prev_boss_pos = (state.boss_x, state.boss_y) if state.boss_active else None
+    for power in state.power_ups:
+        power.prev_x = power.x
+        power.prev_y = power.y
+
+def update_effect_timers():
+    """Count down the screen shake and combo animation (once per tick)"""
+    global screen_shake, combo_display_time, combo_scale
+    if screen_shake > 0:
+        screen_shake -= 1
+    if combo_display_time > 0:
+        combo_display_time -= 1
+        combo_scale = max(1.0, combo_scale - 0.01)
+    else:
+        combo_scale = 1.0
+
+def run_tick(inputs):
+    """Run one logic tick: the simulation step, its effects and the background updates"""
+    global game_time
+    save_positions()
+    if recorder is not None:
+        recorder.record(inputs)
+    outcome = step(state, inputs)
+    t = profiler.now()
+    apply_effects()
+    t = profiler.lap('apply_effects', t)
+    game_time += 1
+    
+    # Update background and effects
+    update_stars()
+    t = profiler.lap('update_stars', t)
+    update_player_trail()
+    t = profiler.lap('update_trail', t)
+    update_particles()
+    profiler.lap('update_particles', t)
+    update_effect_timers()
+    return outcome
+
+def hud_text(size, color):
+    """Render function for a text widget whose value is its text (None hides it)"""
+    return lambda text: None if text is None else text_cache.render(size, text, color)
+
+def render_score(value):
+    """Score, with a yellow copy underneath while the multiplier is active"""
+    score, multiplier = value
+    score_display = f"Score: {score}" + (" x2" if multiplier else "")
+    score_text = text_cache.render(font_size, score_display, (255, 255, 255))
+    if not multiplier:
+        return score_text
+    return [(text_cache.render(font_size, score_display, (255, 255, 0)), (2, 2)), (score_text, (0, 0))]
+
+def render_health_bar(health_width):
+    surface = pygame.Surface((200, 20))
+    surface.fill((50, 50, 50))
+    health_bar.draw(surface, 0, 0, health_width)
+    pygame.draw.rect(surface, (255, 255, 255), (0, 0, 200, 20), 2)
+    return surface
+
+def render_ultimate_bar(value):
+    """Charge bar; once charged its gold fill pulses, so it is drawn live over the HUD"""
+    ult_width, ready = value
+    surface = pygame.Surface((200, 15))
+    surface.fill((30, 30, 30))
+    if not ready:
+        ultimate_bar.draw(surface, 0, 0, ult_width)
+    pygame.draw.rect(surface, (255, 255, 255), (0, 0, 200, 15), 2)
+    return surface
+
+def render_combo(value):
+    """Combo counter with a glow of four offset copies"""
+    if value is None:
+        return None
+    combo, combo_size = value
+    combo_text = text_cache.render(combo_size, f"Combo: {combo}x", (255, 255, 100))
+    glow_text = text_cache.render(combo_size, f"Combo: {combo}x", (255, 200, 0))
+    layers = [(glow_text, (2 + offset[0], 2 + offset[1])) for offset in [(2, 2), (-2, -2), (2, -2), (-2, 2)]]
+    return layers + [(combo_text, (2, 2))]
+
+def render_power_ups(timers):
+    """Right-aligned column of active power-ups and their seconds left"""
+    if not timers:
+        return None
+    lines = [text_cache.render(small_font_size, f"{power_up_names[power_type]}: {seconds}s", (200, 255, 200))
+             for power_type, seconds in timers]
+    width = max(line.get_width() for line in lines)
+    return [(line, (width - line.get_width(), i * 25)) for i, line in enumerate(lines)]
+
+def build_hud():
+    """Register the HUD widgets, in drawing order"""
+    hud.add(lambda: (state.player_score, 'multiplier' in state.active_power_ups), render_score, (10, 10))
+    hud.add(lambda: f"Level: {state.current_level}/{state.max_levels}", hud_text(font_size, (255, 255, 255)), (10, 50))
+    hud.add(lambda: f"Target: {state.winning_scores[state.current_level - 1]}", hud_text(font_size, (200, 200, 255)), (10, 90))
+    hud.add(lambda: f"Lives: {state.player_lives}", hud_text(font_size, (255, 100, 100)), (10, 130))
+    hud.add(lambda: f"Coins: {state.coins}", hud_text(font_size, (255, 255, 100)), (10, 170))
+    hud_bars.add(lambda: int(200 * (state.player_lives / (max_lives + state.upgrades['lives']))), render_health_bar, (10, 210))
+    hud_bars.add(lambda: (int(200 * (state.ultimate_charge / max_ultimate_charge)), state.ultimate_charge >= max_ultimate_charge),
+            render_ultimate_bar, (10, 240))
+    hud.add(lambda: state.ultimate_charge >= max_ultimate_charge,
+            lambda ready: text_cache.render(small_font_size, "ULTIMATE (Q) - READY!", (255, 255, 0)) if ready
+            else text_cache.render(small_font_size, "ULTIMATE (Q)", (255, 255, 255)), (10, 222))
+    hud.add(lambda: (state.combo, int(36 * combo_scale)) if state.combo > 0 else None, render_combo, (8, 8), 'right')
+    hud.add(lambda: f"+{state.combo // 10}x BONUS!" if state.combo >= 10 else None,
+            hud_text(small_font_size, (255, 255, 0)), (10, 50), 'right')
+    hud.add(lambda: f"Max Combo: {state.max_combo}x" if state.max_combo > 0 else None,
+            hud_text(small_font_size, (200, 200, 200)), (10, 50), 'right')
+    hud.add(lambda: tuple((power_type, time_left // 60 + 1) for power_type, time_left in state.active_power_ups.items()),
+            render_power_ups, (10, 90), 'right')
+
+build_hud()
+
+def draw_game():
+    """Draw one frame of the level in progress, interpolated by frame_alpha between ticks"""
+    global flash_color
+    rock_image = assets.get('rock')
+    player_image = assets.get('player')
+    
     # Screen shake
     shake_x = 0
     shake_y = 0
     if screen_shake > 0:
         shake_x = random.randint(-shake_intensity, shake_intensity)
         shake_y = random.randint(-shake_intensity, shake_intensity)
-        screen_shake -= 1
+    
+    # Player position between the last two ticks
+    player_x = int(lerp(prev_player_x, state.player_rect.x, frame_alpha))
+    player_y = state.player_rect.y
+    player_center = (player_x + player_width // 2, state.player_rect.centery)
 
     # Drawing
+    t = profiler.now()
     screen.fill(background_color)
     draw_stars()
+    t = profiler.lap('draw_stars', t)
     draw_particles()
+    t = profiler.lap('draw_particles', t)
     draw_player_trail()
+    t = profiler.lap('draw_trail', t)
    
     # Draw obstacles with enhanced visuals
-    for block in blocks:
-        block_center_x = block['x'] + block['size']//2
-        block_center_y = block['y'] + block['size']//2
+    for x, y, kind, size, rotation in zip(*state.blocks.live(frame_alpha)):
+        block_center_x = x + size//2
+        block_center_y = y + size//2
+        color = block_colors[kind % len(block_colors)]
         
         if rock_image:
             # Add glow to rock
-            glow_size = block['size'] + 10
-            glow_surface = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
-            glow_alpha = int(100 + 50 * math.sin(game_time * 0.2 + block['x'] * 0.01))
-            color = block_colors[obstacle_types.index(block['type']) % len(block_colors)]
-            pygame.draw.circle(glow_surface, (*color, glow_alpha // 3), 
-                             (glow_size//2, glow_size//2), glow_size//2)
-            screen.blit(glow_surface, (block['x'] - 5, block['y'] - 5))
+            glow_size = size + 10
+            glow_alpha = int(100 + 50 * math.sin(game_time * 0.2 + x * 0.01))
+            glow_surface = glow_sprites.circle(glow_size // 2, color, glow_alpha // 3)
+            screen.blit(glow_surface, (x - 5, y - 5))
             
-            rotated_image = pygame.transform.rotate(rock_image, block['rotation'])
-            screen.blit(rotated_image, (block['x'], block['y']))
+            rotated_image = rock_sprites.rotated('rock', rock_image, size, rotation)
+            screen.blit(rotated_image, (block_center_x - rotated_image.get_width() // 2,
+                                        block_center_y - rotated_image.get_height() // 2))
         else:
-            color = block_colors[obstacle_types.index(block['type']) % len(block_colors)]
-            
             # Glow effect
-            glow_size = block['size'] + 8
-            glow_surface = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
-            glow_alpha = int(150 + 100 * math.sin(game_time * 0.2 + block['x'] * 0.01))
-            pygame.draw.rect(glow_surface, (*color, glow_alpha // 2), 
-                           (0, 0, glow_size, glow_size))
-            screen.blit(glow_surface, (block['x'] - 4, block['y'] - 4))
+            glow_size = size + 8
+            glow_alpha = int(150 + 100 * math.sin(game_time * 0.2 + x * 0.01))
+            glow_surface = glow_sprites.square(glow_size, color, glow_alpha // 2)
+            screen.blit(glow_surface, (x - 4, y - 4))
             
             # Main block
-            pygame.draw.rect(screen, color, (block['x'], block['y'], block['size'], block['size']))
-            pygame.draw.rect(screen, (255, 255, 255), (block['x'], block['y'], block['size'], block['size']), 2)
+            pygame.draw.rect(screen, color, (x, y, size, size))
+            pygame.draw.rect(screen, (255, 255, 255), (x, y, size, size), 2)
             
             # Type indicator
-            if block['type'] == 'fast':
+            block_type = obstacle_types[kind]
+            if block_type == 'fast':
                 pygame.draw.circle(screen, (255, 255, 255), 
                                  (block_center_x, block_center_y), 5)
-            elif block['type'] == 'homing':
+            elif block_type == 'homing':
                 pygame.draw.circle(screen, (255, 0, 0), 
                                  (block_center_x, block_center_y), 5)
+    t = profiler.lap('draw_obstacles', t)
    
     # Draw boss
     draw_boss()
+    t = profiler.lap('draw_boss', t)
    
     # Draw power-ups
-    for power in power_ups:
-        draw_power_up(power)
+    for power in state.power_ups:
+        draw_power_up(power, lerp(power.prev_x, power.x, frame_alpha), lerp(power.prev_y, power.y, frame_alpha))
+    t = profiler.lap('draw_power_ups', t)
    
     # Draw player with enhanced effects
-    if invulnerability_time <= 0 or (invulnerability_time // 5) % 2:
-        player_draw_x = player_rect.x + shake_x
-        player_draw_y = player_rect.y + shake_y
+    if state.invulnerability_time <= 0 or (state.invulnerability_time // 5) % 2:
+        player_draw_x = player_x + shake_x
+        player_draw_y = player_y + shake_y
         
         # Player glow effect
-        if 'speed' in active_power_ups:
-            glow_surface = pygame.Surface((player_width + 20, player_height + 20), pygame.SRCALPHA)
+        if 'speed' in state.active_power_ups:
             glow_alpha = int(100 + 100 * math.sin(game_time * 0.3))
-            pygame.draw.ellipse(glow_surface, (255, 200, 100, glow_alpha),
-                              (0, 0, player_width + 20, player_height + 20))
-            screen.blit(glow_surface, (player_draw_x - 10, player_draw_y - 10))
+            effect_layers.ellipse(screen, (player_draw_x - 10, player_draw_y - 10, player_width + 20, player_height + 20),
+                                  (255, 200, 100), glow_alpha)
         
         if player_image:
             screen.blit(player_image, (player_draw_x, player_draw_y))
@@ -1262,192 +1082,211 @@ while running:
             # Inner highlight
             pygame.draw.rect(screen, (100, 255, 100), 
                            (player_draw_x + 5, player_draw_y + 5, player_width - 10, player_height - 10))
+    t = profiler.lap('draw_player', t)
     
     # Ultimate effect with enhanced visuals
-    if ultimate_active:
+    if state.ultimate_active:
         # Multiple glow layers
-        for i in range(3):
-            glow_surface = pygame.Surface((screen_width, screen_height), pygame.SRCALPHA)
-            glow_radius = 200 + i * 50
-            glow_alpha = int((100 + 100 * math.sin(game_time * 0.5)) / (i + 1))
-            glow_color = (255, 200 - i * 30, 0, glow_alpha)
-            pygame.draw.circle(glow_surface, glow_color, 
-                             (player_rect.centerx, player_rect.centery), glow_radius)
-            screen.blit(glow_surface, (0, 0))
+        effect_layers.glow(screen, player_center,
+                           [(200 + i * 50, (255, 200 - i * 30, 0), int((100 + 100 * math.sin(game_time * 0.5)) / (i + 1)))
+                            for i in range(3)])
         
         # Energy waves
-        for i in range(5):
-            wave_radius = 150 + (game_time % 30) * 5 + i * 20
-            wave_alpha = int(150 * (1 - (game_time % 30) / 30))
-            wave_surface = pygame.Surface((wave_radius * 2, wave_radius * 2), pygame.SRCALPHA)
-            pygame.draw.circle(wave_surface, (255, 255, 255, wave_alpha),
-                             (wave_radius, wave_radius), wave_radius, 3)
-            screen.blit(wave_surface, (player_rect.centerx - wave_radius, 
-                                     player_rect.centery - wave_radius))
+        wave_radii = [150 + (game_time % 30) * 5 + i * 20 for i in range(5)]
+        wave_alpha = int(150 * (1 - (game_time % 30) / 30))
+        effect_layers.rings(screen, player_center, wave_radii, (255, 255, 255), wave_alpha, 3)
     
     # Shield effect with enhanced visuals
-    if 'shield' in active_power_ups:
+    if 'shield' in state.active_power_ups:
         shield_alpha = int(100 + 155 * math.sin(game_time * 0.2))
         
         # Outer shield glow
-        outer_shield = pygame.Surface((player_width + 40, player_height + 40), pygame.SRCALPHA)
-        outer_shield.set_alpha(shield_alpha // 3)
-        pygame.draw.ellipse(outer_shield, (100, 200, 255),
-                          (0, 0, player_width + 40, player_height + 40), 5)
-        screen.blit(outer_shield, (player_rect.x - 20 + shake_x, player_rect.y - 20 + shake_y))
+        effect_layers.ellipse(screen, (player_x - 20 + shake_x, player_y - 20 + shake_y, player_width + 40, player_height + 40),
+                              (100, 200, 255), shield_alpha // 3, 5)
         
         # Main shield
-        shield_surface = pygame.Surface((player_width + 20, player_height + 20), pygame.SRCALPHA)
-        shield_surface.set_alpha(shield_alpha)
-        pygame.draw.ellipse(shield_surface, (100, 200, 255),
-                          (0, 0, player_width + 20, player_height + 20), 3)
-        screen.blit(shield_surface, (player_rect.x - 10 + shake_x, player_rect.y - 10 + shake_y))
+        effect_layers.ellipse(screen, (player_x - 10 + shake_x, player_y - 10 + shake_y, player_width + 20, player_height + 20),
+                              (100, 200, 255), shield_alpha, 3)
         
         # Shield particles
         for i in range(8):
             angle = (game_time * 0.1 + i * math.pi / 4) % (2 * math.pi)
-            particle_x = player_rect.centerx + math.cos(angle) * (player_width // 2 + 15)
-            particle_y = player_rect.centery + math.sin(angle) * (player_height // 2 + 15)
+            particle_x = player_center[0] + math.cos(angle) * (player_width // 2 + 15)
+            particle_y = player_center[1] + math.sin(angle) * (player_height // 2 + 15)
             particle_alpha = int(200 + 55 * math.sin(game_time * 0.3 + i))
-            particle_surface = pygame.Surface((8, 8), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surface, (100, 200, 255, particle_alpha), (4, 4), 4)
+            particle_surface = glow_sprites.circle(4, (100, 200, 255), particle_alpha)
             screen.blit(particle_surface, (int(particle_x) - 4, int(particle_y) - 4))
+    t = profiler.lap('draw_effects', t)
    
-    # Draw UI with enhanced visuals
-    score_display = f"Score: {player_score}"
-    if 'multiplier' in active_power_ups:
-        score_display += " x2"
-        # Animated multiplier indicator
-        multiplier_glow = font.render(score_display, True, (255, 255, 0))
-        screen.blit(multiplier_glow, (12, 12))
-    score_text = font.render(score_display, True, (255, 255, 255))
-    screen.blit(score_text, (10, 10))
-    
-    level_text = font.render(f"Level: {current_level}/{max_levels}", True, (255, 255, 255))
-    screen.blit(level_text, (10, 50))
-    
-    target_text = font.render(f"Target: {winning_scores[current_level - 1]}", True, (200, 200, 255))
-    screen.blit(target_text, (10, 90))
-    
-    lives_text = font.render(f"Lives: {player_lives}", True, (255, 100, 100))
-    screen.blit(lives_text, (10, 130))
-    
-    coins_text = font.render(f"Coins: {coins}", True, (255, 255, 100))
-    screen.blit(coins_text, (10, 170))
-    
-    # Health bar with gradient
-    bar_width = 200
-    bar_height = 20
-    bar_x = 10
-    bar_y = 210
-    pygame.draw.rect(screen, (50, 50, 50), (bar_x, bar_y, bar_width, bar_height))
-    health_width = int(bar_width * (player_lives / (max_lives + upgrades['lives'])))
-    if health_width > 0:
-        # Gradient health bar
-        health_surface = pygame.Surface((health_width, bar_height), pygame.SRCALPHA)
-        for i in range(health_width):
-            ratio = i / bar_width if bar_width > 0 else 0
-            r = int(255 - ratio * 100)
-            g = int(100 + ratio * 100)
-            b = 100
-            pygame.draw.line(health_surface, (r, g, b), (i, 0), (i, bar_height))
-        screen.blit(health_surface, (bar_x, bar_y))
-    pygame.draw.rect(screen, (255, 255, 255), (bar_x, bar_y, bar_width, bar_height), 2)
-    
-    # Health bar glow when low
-    if player_lives <= 1:
+    # HUD widgets are re-rendered only when their values change. Pulsing
+    # parts change every frame, so they are drawn live between the bars and
+    # the text above them.
+    hud_bars.draw(screen)
+    if state.player_lives <= 1:
         glow_alpha = int(100 + 100 * math.sin(game_time * 0.5))
-        health_glow = pygame.Surface((bar_width + 4, bar_height + 4), pygame.SRCALPHA)
-        pygame.draw.rect(health_glow, (255, 100, 100, glow_alpha), 
-                       (0, 0, bar_width + 4, bar_height + 4))
-        screen.blit(health_glow, (bar_x - 2, bar_y - 2))
-    
-    # Ultimate charge bar with enhanced visuals
-    ult_bar_width = 200
-    ult_bar_height = 15
-    ult_bar_x = 10
-    ult_bar_y = 240
-    pygame.draw.rect(screen, (30, 30, 30), (ult_bar_x, ult_bar_y, ult_bar_width, ult_bar_height))
-    ult_width = int(ult_bar_width * (ultimate_charge / max_ultimate_charge))
-    
-    if ult_width > 0:
-        # Animated gradient for ultimate bar
-        ult_surface = pygame.Surface((ult_width, ult_bar_height), pygame.SRCALPHA)
-        for i in range(ult_width):
-            if ultimate_charge >= max_ultimate_charge:
-                # Pulsing gold when ready
-                pulse = int(50 * math.sin(game_time * 0.3))
-                r = 255
-                g = 200 + pulse
-                b = 0
-            else:
-                # Purple gradient
-                ratio = i / ult_bar_width if ult_bar_width > 0 else 0
-                r = int(200 - ratio * 50)
-                g = int(100 + ratio * 50)
-                b = 255
-            pygame.draw.line(ult_surface, (r, g, b), (i, 0), (i, ult_bar_height))
-        screen.blit(ult_surface, (ult_bar_x, ult_bar_y))
-    
-    pygame.draw.rect(screen, (255, 255, 255), (ult_bar_x, ult_bar_y, ult_bar_width, ult_bar_height), 2)
-    
-    # Glow when ready
-    if ultimate_charge >= max_ultimate_charge:
+        effect_layers.rect(screen, (8, 208, 204, 24), (255, 100, 100), glow_alpha)
+    if state.ultimate_charge >= max_ultimate_charge:
+        # Pulsing gold when ready
+        screen.fill((255, 200 + int(50 * math.sin(game_time * 0.3)), 0), (12, 242, 196, 11))
         glow_alpha = int(100 + 100 * math.sin(game_time * 0.5))
-        ult_glow = pygame.Surface((ult_bar_width + 4, ult_bar_height + 4), pygame.SRCALPHA)
-        pygame.draw.rect(ult_glow, (255, 200, 0, glow_alpha), 
-                        (0, 0, ult_bar_width + 4, ult_bar_height + 4))
-        screen.blit(ult_glow, (ult_bar_x - 2, ult_bar_y - 2))
+        effect_layers.rect(screen, (8, 238, 204, 19), (255, 200, 0), glow_alpha)
+    hud.draw(screen)
+    t = profiler.lap('draw_hud', t)
     
-    ult_text = small_font.render("ULTIMATE (Q)", True, (255, 255, 255))
-    if ultimate_charge >= max_ultimate_charge:
-        ult_text = small_font.render("ULTIMATE (Q) - READY!", True, (255, 255, 0))
-    screen.blit(ult_text, (ult_bar_x, ult_bar_y - 18))
+    # Full-screen flash from the ultimate or a defeated boss
+    if flash_color:
+        effect_layers.flash(screen, flash_color)
+        flash_color = None
+    profiler.lap('draw_effects', t)
+
+    if show_profiler:
+        draw_profiler_overlay()
+
+def draw_profiler_overlay():
+    """Draw the p50/p99 time of every profiled phase in the bottom-left corner"""
+    global profiler_lines, profiler_panel
+    if not profiler_lines or profiler.frames % profiler_refresh == 0:
+        summary = profiler.summary()
+        profiler_lines = [f"{'phase':<15}{'p50 ms':>8}{'p99 ms':>8}"]
+        for phase in sorted(summary, key=lambda name: -summary[name]['p99']):
+            times = summary[phase]
+            profiler_lines.append(f"{phase:<15}{times['p50']:>8.2f}{times['p99']:>8.2f}")
+
+    line_height = 16
+    font = text_cache.font(tiny_font_size)
+    width = max(font.size(line)[0] for line in profiler_lines) + 12
+    height = len(profiler_lines) * line_height + 8
+    top = screen_height - height - 10
+    if profiler_panel is None or profiler_panel.get_size() != (width, height):
+        profiler_panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        profiler_panel.fill((0, 0, 0, 170))
+    screen.blit(profiler_panel, (10, top))
+    for i, line in enumerate(profiler_lines):
+        screen.blit(text_cache.render(tiny_font_size, line, (180, 255, 180)), (16, top + 4 + i * line_height))
+
+def show_splash():
+    """Draw the title once while the profile and assets are still loading"""
+    screen.fill(background_color)
+    title = text_cache.render(big_font_size, "Dodge the Falling Blocks", (255, 255, 255))
+    screen.blit(title, (screen_width // 2 - title.get_width() // 2, screen_height // 2 - 60))
+    loading = text_cache.render(small_font_size, "Loading...", (150, 150, 200))
+    screen.blit(loading, (screen_width // 2 - loading.get_width() // 2, screen_height // 2 + 20))
+    pygame.display.flip()
+
+def main():
+    """Run the windowed game: menu, levels and end screens"""
+    global game_state, frame_alpha, show_profiler
+    show_splash()
+    running = show_menu()  # The profile and assets keep loading; the first run waits for them
+    use_ultimate = False
+    accumulator = 0.0
+    last_time = time.perf_counter()
     
-    # Combo with enhanced display
-    if combo > 0:
-        # Animate combo scale
-        if combo_display_time > 0:
-            combo_display_time -= 1
-            combo_scale = max(1.0, combo_scale - 0.01)
-        else:
-            combo_scale = 1.0
+    # Main game loop
+    while running:
+        clock.tick() if UNCAPPED else clock.tick(60)
+        now = time.perf_counter()
+        # Bounded catch-up: after a stall the game slows down instead of jumping ahead
+        accumulator += min(now - last_time, max_ticks_per_frame * tick_seconds)
+        last_time = now
+        profiler.begin_frame()
+        t = profiler.now()
         
-        # Combo text with glow
-        combo_size = int(36 * combo_scale)
-        combo_font = pygame.font.Font(None, combo_size)
-        combo_text = combo_font.render(f"Combo: {combo}x", True, (255, 255, 100))
+        # Handle events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_q and game_state == "playing":
+                    use_ultimate = True
+                elif event.key == pygame.K_ESCAPE:
+                    if recorder is not None and game_state == "playing":
+                        recorder.escape()
+                    game_state = "menu"
+                elif event.key == pygame.K_F3:
+                    show_profiler = not show_profiler
         
-        # Glow effect
-        glow_text = combo_font.render(f"Combo: {combo}x", True, (255, 200, 0))
-        for offset in [(2, 2), (-2, -2), (2, -2), (-2, 2)]:
-            screen.blit(glow_text, (screen_width - combo_text.get_width() - 10 + offset[0], 
-                                   10 + offset[1]))
-        screen.blit(combo_text, (screen_width - combo_text.get_width() - 10, 10))
+        if not running:
+            break
         
-        # Combo multiplier indicator
-        if combo >= 10:
-            multiplier_text = small_font.render(f"+{combo // 10}x BONUS!", True, (255, 255, 0))
-            screen.blit(multiplier_text, (screen_width - multiplier_text.get_width() - 10, 50))
-    
-    # Max combo
-    if max_combo > 0:
-        max_combo_text = small_font.render(f"Max Combo: {max_combo}x", True, (200, 200, 200))
-        screen.blit(max_combo_text, (screen_width - max_combo_text.get_width() - 10, 50))
+        if game_state == "menu":
+            end_run()
+            gc_policy.resume()
+            if not show_menu():
+                running = False
+            accumulator = 0.0
+            last_time = time.perf_counter()
+            continue
+        
+        if game_state != "playing":
+            continue
+        
+        # Run the logic ticks that are due
+        keys = pygame.key.get_pressed()
+        t = profiler.lap('input', t)
+        outcome = None
+        ticks = 0
+        while accumulator >= tick_seconds and ticks < max_ticks_per_frame:
+            outcome = run_tick(Inputs(keys[pygame.K_LEFT], keys[pygame.K_RIGHT], use_ultimate))
+            use_ultimate = False
+            accumulator -= tick_seconds
+            ticks += 1
+            if outcome:
+                break
+        
+        if outcome == 'game_over':
+            save_replay(outcome)
+            record_high_score(outcome)
+            show_game_over()
+            game_state = "menu"
+            continue
+        elif outcome == 'level_complete':
+            if not show_level_start():
+                running = False
+                continue
+            save_positions()
+            accumulator = 0.0
+            last_time = time.perf_counter()
+        elif outcome == 'victory':
+            save_replay(outcome)
+            record_high_score(outcome)
+            show_victory()
+            game_state = "menu"
+            continue
+        
+        frame_alpha = min(1.0, accumulator / tick_seconds)
+        draw_game()
+        t = profiler.now()
+        pygame.display.flip()
+        profiler.lap('flip', t)
+        profiler.end_frame()
     
-    # Active power-ups
-    y_offset = 90
-    for power_type, time_left in active_power_ups.items():
-        power_names = {
-            'shield': 'Shield',
-            'speed': 'Speed Boost',
-            'slow_motion': 'Slow Motion',
-            'multiplier': 'Score x2'
-        }
-        power_text = small_font.render(f"{power_names[power_type]}: {time_left // 60 + 1}s", True, (200, 255, 200))
-        screen.blit(power_text, (screen_width - power_text.get_width() - 10, y_offset))
-        y_offset += 25
-
-    pygame.display.flip()
-
-pygame.quit()
+    if game_state == "playing":
+        end_run()  # Closed mid-run: keep the coins earned so far
+    else:
+        save_profile()
+        save_replay('quit')
+    profile.flush()
+    high_scores.flush()
+    if ASSET_REPORT:
+        print("Asset load times:")
+        for line in assets.report():
+            print(f"  {line}")
+    if POOL_REPORT:
+        print("Entity pools (reused = allocations avoided):")
+        for name, pool in (('power-ups', power_up_pool), ('confetti', confetti_pool)):
+            print(f"  {name}: {pool.stats()}")
+        print("Garbage collector:")
+        for line in gc_policy.report():
+            print(f"  {line}")
+    if run_history:
+        run_history.close()
+    if PROFILE_OUT and profiler.frames:
+        profiler.dump(PROFILE_OUT)
+    pygame.quit()
+
+if __name__ == '__main__':
+    if HEADLESS:
+        headless_main()
+    else:
+        main()
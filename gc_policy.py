@@ -0,0 +1,62 @@
+import gc
+import time
+
+
+class GcPolicy:
+    """When the cyclic garbage collector may run.
+
+    freeze() moves everything alive once loading has finished into the
+    permanent generation, so later collections never scan it again; only
+    its first call freezes. pause() turns
+    automatic collection off while a level is played (entities are pooled
+    and garbage is freed by reference counting) and resume() turns it back
+    on; collect() runs a full collection at a moment where a pause is not
+    seen, such as between levels. Every collection, automatic or not, is
+    counted and timed through gc.callbacks.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.collections = [0, 0, 0]   # Per generation
+        self.pause_ms = 0.0
+        self.max_pause_ms = 0.0
+        self.frozen = 0
+        self._started = None
+        gc.callbacks.append(self._callback)
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            ms = (time.perf_counter() - self._started) * 1000
+            self._started = None
+            self.collections[info['generation']] += 1
+            self.pause_ms += ms
+            self.max_pause_ms = max(self.max_pause_ms, ms)
+
+    def freeze(self):
+        """Collect, then exclude every surviving object from future collections (first call only)"""
+        if self.enabled and not self.frozen:
+            gc.collect()
+            gc.freeze()
+            self.frozen = gc.get_freeze_count()
+
+    def pause(self):
+        """Stop automatic collections (start of a level)"""
+        if self.enabled:
+            gc.disable()
+
+    def resume(self):
+        """Allow automatic collections again"""
+        gc.enable()
+
+    def collect(self):
+        """Full collection at a convenient moment (between levels)"""
+        if self.enabled:
+            gc.collect()
+
+    def report(self):
+        """Lines describing the collections so far"""
+        return [f"collections per generation: {self.collections[0]} / {self.collections[1]} / {self.collections[2]}",
+                f"time in collections: {self.pause_ms:.1f} ms (longest {self.max_pause_ms:.1f} ms)",
+                f"objects frozen after loading: {self.frozen}"]
@@ -0,0 +1,125 @@
+import atexit
+import json
+import threading
+import time
+
+from atomic_file import write_atomic
+
+
+class HighScoreStore:
+    """Best score, best combo and a top-N leaderboard of runs, kept in a JSON file.
+
+    The file is read on first use. save() never blocks: it hands the
+    current data to a background writer thread that replaces the file
+    atomically (see atomic_file.write_atomic), and saves requested while a write is pending are coalesced into one.
+    Pending writes are flushed at interpreter exit.
+    """
+
+    def __init__(self, path, max_entries=10):
+        self.path = path
+        self.max_entries = max_entries
+        self.writes = 0           # Files written
+        self.coalesced = 0        # Saves merged into a later one
+        self.error = None         # Last load or write error, if any
+        self._entries = None
+        self._best_score = 0
+        self._best_combo = 0
+        self._cond = threading.Condition()
+        self._pending = None      # JSON text waiting for the writer
+        self._writing = False
+        self._thread = None
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = []
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.error = e
+            return
+        if not isinstance(data, dict):
+            self.error = ValueError(f"{self.path} does not hold a JSON object")
+            return
+        # Files from older versions only have the two best values
+        self._best_score = data.get('high_score', 0)
+        self._best_combo = data.get('max_combo', 0)
+        self._entries = data.get('leaderboard', [])[:self.max_entries]
+
+    @property
+    def best_score(self):
+        self._load()
+        return self._best_score
+
+    @property
+    def best_combo(self):
+        self._load()
+        return self._best_combo
+
+    def leaderboard(self):
+        """Copy of the top runs, best first"""
+        self._load()
+        return [dict(entry) for entry in self._entries]
+
+    def record(self, score, max_combo, **stats):
+        """Add a finished run and save in the background.
+
+        ``stats`` are extra per-run values stored with the entry (level,
+        outcome, ...). Returns the run's 1-based leaderboard rank, or None if
+        it did not make the leaderboard.
+        """
+        self._load()
+        entry = {'score': score, 'max_combo': max_combo, 'time': int(time.time())}
+        entry.update(stats)
+        self._best_score = max(self._best_score, score)
+        self._best_combo = max(self._best_combo, max_combo)
+
+        entries = self._entries
+        rank = len(entries)
+        while rank > 0 and (entries[rank - 1]['score'], entries[rank - 1]['max_combo']) < (score, max_combo):
+            rank -= 1
+        entries.insert(rank, entry)
+        del entries[self.max_entries:]
+        self.save()
+        return rank + 1 if rank < self.max_entries else None
+
+    def save(self):
+        """Queue the current data for writing; returns immediately"""
+        self._load()
+        text = json.dumps({'high_score': self._best_score, 'max_combo': self._best_combo,
+                           'leaderboard': self._entries}, indent=1)
+        with self._cond:
+            if self._pending is not None:
+                self.coalesced += 1
+            self._pending = text
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, name='highscore-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+            self._cond.notify_all()
+
+    def flush(self, timeout=5.0):
+        """Wait until queued saves are on disk; returns False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending is None and not self._writing, timeout)
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None)
+                text, self._pending = self._pending, None
+                self._writing = True
+            self._write_file(text)
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+    def _write_file(self, text):
+        try:
+            write_atomic(self.path, text, prefix='.highscore-')
+            self.writes += 1
+        except OSError as e:
+            self.error = e
@@ -0,0 +1,155 @@
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+schema = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    seed INTEGER,
+    outcome TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    max_combo INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    coins INTEGER NOT NULL,
+    boss_kills INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    level_scores TEXT NOT NULL,
+    upgrades TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC, max_combo DESC);
+CREATE INDEX IF NOT EXISTS runs_by_date ON runs (finished_at);
+"""
+
+columns = ('finished_at', 'seed', 'outcome', 'score', 'max_combo', 'level', 'coins', 'boss_kills',
+           'seconds', 'level_scores', 'upgrades')
+insert_sql = f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+class RunHistory:
+    """Every finished run in a SQLite database, for leaderboards and statistics.
+
+    record() only queues the run; a background thread inserts queued runs
+    in batches (one transaction per batch, at most ``flush_interval``
+    seconds after the first one arrived). The database runs in WAL mode, so
+    queries from the game thread read while the writer writes. Leaderboard
+    pages come from the score index.
+    """
+
+    def __init__(self, path, batch_size=64, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.inserted = 0
+        self.batches = 0
+        self.queued = 0           # Runs handed to record() (game thread only)
+        self.processed = 0        # Runs the writer is done with, committed or not (writer only)
+        self.error = None         # Last database error, if any
+        self._queue = queue.Queue()
+        self._thread = None
+        self._reader = None
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(schema)
+        return connection
+
+    def record(self, score, max_combo, level, outcome, coins=0, boss_kills=0, seconds=0.0,
+               level_scores=(), upgrades=None, seed=None):
+        """Queue a finished run for insertion; returns immediately.
+
+        ``seconds`` is the game time played and ``upgrades`` the upgrade
+        levels the run started with.
+        """
+        row = (time.time(), seed, outcome, score, max_combo, level, coins, boss_kills, seconds,
+               json.dumps(list(level_scores)), json.dumps(upgrades or {}))
+        self.queued += 1
+        self._queue.put(row)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, name='history-writer', daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    @property
+    def pending(self):
+        """Number of recorded runs the writer has not committed yet"""
+        return self.queued - self.processed
+
+    def flush(self, timeout=5.0):
+        """Wait until every queued run is committed; returns False on timeout.
+
+        With ``timeout=0`` this only asks the writer to commit its batch now
+        instead of after ``flush_interval``; poll ``pending`` to see it done.
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _write_loop(self):
+        try:
+            connection = self._connect()
+        except sqlite3.Error as e:
+            self.error = e
+            connection = None
+        batch = []
+        deadline = None
+        while True:
+            try:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if isinstance(item, tuple):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+            if batch and connection is not None:
+                try:
+                    with connection:
+                        connection.executemany(insert_sql, batch)
+                    self.inserted += len(batch)
+                    self.batches += 1
+                except sqlite3.Error as e:
+                    self.error = e
+            self.processed += len(batch)
+            batch = []
+            deadline = None
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _query(self, sql, params=()):
+        if self._reader is None:
+            self._reader = self._connect()
+        return self._reader.execute(sql, params).fetchall()
+
+    def count(self):
+        """Number of runs stored"""
+        return self._query("SELECT COUNT(*) FROM runs")[0][0]
+
+    def top(self, limit=10, offset=0):
+        """One page of the leaderboard (best score first, then best combo) as dicts"""
+        rows = self._query(f"SELECT {', '.join(columns)} FROM runs "
+                           "ORDER BY score DESC, max_combo DESC LIMIT ? OFFSET ?", (limit, offset))
+        runs = []
+        for row in rows:
+            run = dict(zip(columns, row))
+            run['level_scores'] = json.loads(run['level_scores'])
+            run['upgrades'] = json.loads(run['upgrades'])
+            runs.append(run)
+        return runs
+
+    def close(self):
+        """Commit queued runs and close the query connection"""
+        self.flush()
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
@@ -0,0 +1,348 @@
+import math
+import operator
+
+import numpy as np
+
+
+class ObstacleStore:
+    """Falling obstacles stored as parallel columns, one per field.
+
+    With up to ``list_max`` obstacles the columns are plain Python lists and
+    every operation is a short Python loop: at the handful of obstacles of
+    normal play that is cheaper than NumPy's fixed cost per call. Past
+    ``list_max`` they become preallocated NumPy arrays (growing by doubling)
+    and operations are vectorized; they turn back into lists once fewer than
+    half of ``list_max`` remain. Both layouts give the same results.
+
+    Live obstacles occupy the first ``count`` slots. Removal is swap-and-pop
+    (the last live obstacle moves into the hole), so slot order is not spawn
+    order; every obstacle carries a spawn ``id`` for anything that needs a
+    stable order. Obstacles are never dropped. snapshot() keeps the previous
+    positions so a renderer can interpolate between ticks.
+    """
+
+    list_max = 64
+
+    # Field name -> array dtype. Positions and speeds stay float64 so results match plain Python floats
+    _dtypes = {'x': np.float64, 'y': np.float64, 'speed': np.float64, 'rotation': np.int32,
+               'bounce': np.int8, 'size': np.int16, 'kind': np.uint8, 'ids': np.int64,
+               'prev_x': np.float64, 'prev_y': np.float64}
+    _fields = tuple(_dtypes)
+
+    def __init__(self, types, width, capacity=256):
+        self.types = tuple(types)
+        self.codes = {name: code for code, name in enumerate(self.types)}
+        self.bouncy = self.codes.get('bouncy', -1)
+        self.homing = self.codes.get('homing', -1)
+        self.width = width
+        self.capacity = capacity  # Array length once the columns are arrays
+        self.count = 0
+        self.next_id = 0
+        self.vector = False       # Columns are NumPy arrays rather than lists
+        for name in self._fields:
+            setattr(self, name, [])
+
+    def __len__(self):
+        return self.count
+
+    def _to_arrays(self):
+        while self.capacity <= self.count:
+            self.capacity *= 2
+        for name, dtype in self._dtypes.items():
+            arr = np.zeros(self.capacity, dtype=dtype)
+            arr[:self.count] = getattr(self, name)
+            setattr(self, name, arr)
+        self.vector = True
+
+    def _to_lists(self):
+        for name in self._fields:
+            setattr(self, name, getattr(self, name)[:self.count].tolist())
+        self.vector = False
+
+    def _removed(self):
+        if self.vector and self.count < self.list_max // 2:
+            self._to_lists()
+
+    def _grow(self):
+        self.capacity *= 2
+        for name in self._fields:
+            old = getattr(self, name)
+            new = np.zeros(self.capacity, dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, x, y, kind, speed, size, bounce=0):
+        """Add an obstacle of type name ``kind``; returns its slot"""
+        i = self.count
+        if not self.vector:
+            x, y = float(x), float(y)
+            for name, value in (('x', x), ('y', y), ('speed', float(speed)), ('rotation', 0),
+                                ('bounce', bounce), ('size', size), ('kind', self.codes[kind]),
+                                ('ids', self.next_id), ('prev_x', x), ('prev_y', y)):
+                getattr(self, name).append(value)
+            self.next_id += 1
+            self.count += 1
+            if self.count > self.list_max:
+                self._to_arrays()
+            return i
+        if self.count == self.capacity:
+            self._grow()
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.speed[i] = speed
+        self.rotation[i] = 0
+        self.bounce[i] = bounce
+        self.size[i] = size
+        self.kind[i] = self.codes[kind]
+        self.ids[i] = self.next_id
+        self.next_id += 1
+        self.count += 1
+        return i
+
+    def update(self, fall_multiplier, rect, bottom):
+        """Advance every obstacle one tick: fall, spin, bounce off the walls and home in on the centre
+        of the pygame.Rect ``rect``. Returns what landed(rect, bottom) returns afterwards.
+        """
+        n = self.count
+        if n == 0:
+            return []
+        if not self.vector:
+            # One obstacle at a time, same arithmetic as below, checking landed() as it goes
+            x, y, speed, rotation, kind, size = self.x, self.y, self.speed, self.rotation, self.kind, self.size
+            homing, bouncy = self.homing, self.bouncy
+            target_x, target_y = rect.center
+            left, top, right, rect_bottom = rect.left, rect.top, rect.right, rect.bottom
+            events = []
+            for i in range(n):
+                y[i] = new_y = y[i] + speed[i] * fall_multiplier
+                rotation[i] += 2
+                code = kind[i]
+                if code == homing:
+                    if new_y > 0:
+                        dx = target_x - x[i]
+                        dy = target_y - new_y
+                        distance = math.sqrt(dx * dx + dy * dy)
+                        if distance > 0:
+                            x[i] = float(max(0, min(self.width - size[i], x[i] + (dx / distance) * 2)))
+                elif code == bouncy:
+                    bounce = self.bounce
+                    x[i] = new_x = x[i] + bounce[i] * 2
+                    if new_x <= 0 or new_x >= self.width - size[i]:
+                        bounce[i] = -bounce[i]
+                if new_y + size[i] > top:
+                    block_x, block_y = int(x[i]), int(new_y)
+                    hit = (block_x < right and block_x + size[i] > left and
+                           block_y < rect_bottom and block_y + size[i] > top)
+                    if hit or new_y >= bottom:
+                        events.append((i, hit))
+            if len(events) > 1:
+                ids = self.ids
+                events.sort(key=lambda event: ids[event[0]])
+            return events
+        target_x, target_y = rect.center
+        x, y = self.x[:n], self.y[:n]
+        kind, size = self.kind[:n], self.size[:n]
+        y += self.speed[:n] * fall_multiplier
+        self.rotation[:n] += 2
+
+        # Homing obstacles drift towards the target once they are on screen
+        homing = ((kind == self.homing) & (y > 0)).nonzero()[0]
+        if len(homing):
+            dx = target_x - x[homing]
+            dy = target_y - y[homing]
+            distance = np.sqrt(dx * dx + dy * dy)
+            moving = distance > 0
+            homing, dx, distance = homing[moving], dx[moving], distance[moving]
+            x[homing] = np.maximum(0, np.minimum(self.width - size[homing],
+                                                 x[homing] + (dx / distance) * 2))
+
+        bouncy = (kind == self.bouncy).nonzero()[0]
+        if len(bouncy):
+            bounce = self.bounce[:n]
+            x[bouncy] += bounce[bouncy] * 2
+            bx = x[bouncy]
+            walls = bouncy[(bx <= 0) | (bx >= self.width - size[bouncy])]
+            bounce[walls] *= -1
+        return self.landed(rect, bottom)
+
+    def landed(self, rect, bottom):
+        """(slot, hit) pairs, in spawn order, of the obstacles that overlap the pygame.Rect
+        ``rect`` (hit is True) or have fallen to ``bottom``.
+
+        Only obstacles whose bottom edge is below ``rect.top`` can do either.
+        Positions are truncated like pygame.Rect does with float coordinates.
+        """
+        n = self.count
+        if n == 0:
+            return []
+        if not self.vector:
+            x, y, size = self.x, self.y, self.size
+            top = rect.top
+            if max(map(operator.add, y, size)) <= top:
+                return []         # Usually nothing has reached the player's row yet
+            left, right, rect_bottom = rect.left, rect.right, rect.bottom
+            events = []
+            for i in range(n):
+                if y[i] + size[i] > top:
+                    block_x, block_y = int(x[i]), int(y[i])
+                    hit = (block_x < right and block_x + size[i] > left and
+                           block_y < rect_bottom and block_y + size[i] > top)
+                    if hit or y[i] >= bottom:
+                        events.append((i, hit))
+            if len(events) > 1:
+                ids = self.ids
+                events.sort(key=lambda event: ids[event[0]])
+            return events
+        slots = (self.y[:n] + self.size[:n] > rect.top).nonzero()[0]
+        if len(slots) == 0:
+            return []
+        if len(slots) > 1:
+            slots = slots[np.argsort(self.ids[slots], kind='stable')]
+        x = np.trunc(self.x[slots])
+        y = np.trunc(self.y[slots])
+        size = self.size[slots]
+        hits = (x < rect.right) & (x + size > rect.left) & (y < rect.bottom) & (y + size > rect.top)
+        handle = hits | (self.y[slots] >= bottom)
+        return list(zip(slots[handle].tolist(), hits[handle].tolist()))
+
+    def lowest_in(self, left, top, right, bottom):
+        """Slot of the lowest obstacle touching the area (edges included), the oldest on ties; None if there is none"""
+        n = self.count
+        if not n:
+            return None
+        if not self.vector:
+            x, y, size = self.x, self.y, self.size
+            best = best_y = None
+            for i in range(n):
+                y_i = y[i]
+                if y_i > bottom or y_i + size[i] < top:
+                    continue
+                x_i = x[i]
+                if x_i + size[i] < left or x_i > right:
+                    continue
+                if best is None or y_i > best_y or (y_i == best_y and self.ids[i] < self.ids[best]):
+                    best, best_y = i, y_i
+            return best
+        x, y, size = self.x[:n], self.y[:n], self.size[:n]
+        candidates = ((y <= bottom) & (y + size >= top) & (x + size >= left) & (x <= right)).nonzero()[0]
+        if len(candidates) == 0:
+            return None
+        lowest = candidates[y[candidates] == y[candidates].max()]
+        return int(lowest[np.argmin(self.ids[lowest])])
+
+    def oldest(self):
+        """Slot of the obstacle spawned first"""
+        if not self.vector:
+            return self.ids.index(min(self.ids))
+        return int(np.argmin(self.ids[:self.count]))
+
+    def remove(self, slot):
+        """Remove the obstacle in ``slot`` by moving the last one into its place"""
+        last = self.count - 1
+        for name in self._fields:
+            column = getattr(self, name)
+            if slot != last:
+                column[slot] = column[last]
+            if not self.vector:
+                column.pop()
+        self.count = last
+        self._removed()
+
+    def remove_many(self, slots):
+        """Remove several obstacles at once (swap-and-pop, filling holes from the tail in order)"""
+        if len(slots) == 0:
+            return
+        n = self.count
+        if not self.vector:
+            slots = sorted(set(slots))
+            remaining = n - len(slots)
+            holes = [slot for slot in slots if slot < remaining]
+            gone = set(slots)
+            sources = [i for i in range(remaining, n) if i not in gone]
+            for name in self._fields:
+                column = getattr(self, name)
+                for hole, source in zip(holes, sources):
+                    column[hole] = column[source]
+                del column[remaining:]
+            self.count = remaining
+            return
+        slots = np.unique(np.asarray(slots, dtype=np.intp))
+        remaining = n - len(slots)
+        # Holes left below the new count get filled by survivors from the tail
+        holes = slots[slots < remaining]
+        tail = np.ones(n - remaining, dtype=bool)
+        tail[slots[slots >= remaining] - remaining] = False
+        sources = tail.nonzero()[0] + remaining
+        for name in self._fields:
+            arr = getattr(self, name)
+            arr[holes] = arr[sources]
+        self.count = remaining
+        self._removed()
+
+    def remove_below(self, limit):
+        """Remove the obstacles whose top edge is at or below ``limit``"""
+        if not self.vector:
+            if not self.count or max(self.y) < limit:
+                return
+            slots = [i for i, y in enumerate(self.y) if y >= limit]
+        else:
+            slots = (self.y[:self.count] >= limit).nonzero()[0]
+        if len(slots):
+            self.remove_many(slots)
+
+    def clear(self):
+        """Remove every obstacle"""
+        self.count = 0
+        if self.vector:
+            self._to_lists()
+        else:
+            for name in self._fields:
+                getattr(self, name).clear()
+
+    def snapshot(self):
+        """Remember the current positions as the previous ones (call before a tick)"""
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def to_dict(self):
+        """Plain-Python copy of the live obstacles (for checkpoints)"""
+        n = self.count
+        data = {'types': list(self.types), 'width': self.width, 'next_id': self.next_id}
+        for name in self._fields:
+            column = getattr(self, name)[:n]
+            data[name] = column if not self.vector else column.tolist()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a store saved with to_dict()"""
+        n = len(data['ids'])
+        store = cls(data['types'], data['width'], capacity=max(256, n))
+        for name in cls._fields:
+            setattr(store, name, list(data[name]))
+        store.count = n
+        store.next_id = data['next_id']
+        if n > store.list_max:
+            store._to_arrays()
+        return store
+
+    def live(self, alpha=None):
+        """Return plain Python lists (x, y, kind, size, rotation) of the live obstacles for drawing.
+
+        With ``alpha`` the positions are interpolated that far from the last
+        snapshot() towards the current ones.
+        """
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        if not self.vector:
+            if alpha is not None:
+                x = [prev + (now - prev) * alpha for prev, now in zip(self.prev_x, x)]
+                y = [prev + (now - prev) * alpha for prev, now in zip(self.prev_y, y)]
+            return x, y, self.kind[:], self.size[:], self.rotation[:]
+        if alpha is not None:
+            prev_x, prev_y = self.prev_x[:n], self.prev_y[:n]
+            x = prev_x + (x - prev_x) * alpha
+            y = prev_y + (y - prev_y) * alpha
+        return (x.tolist(), y.tolist(), self.kind[:n].tolist(),
+                self.size[:n].tolist(), self.rotation[:n].tolist())
@@ -0,0 +1,141 @@
+import numpy as np
+
+# What to do when an emit would exceed the pool capacity
+OVERFLOW_DROP_NEW = 'drop_new'              # ignore the particles that do not fit
+OVERFLOW_REPLACE_OLDEST = 'replace_oldest'  # overwrite the particles closest to dying
+overflow_policies = (OVERFLOW_DROP_NEW, OVERFLOW_REPLACE_OLDEST)
+
+
+class ParticlePool:
+    """Fixed-capacity particle storage backed by preallocated NumPy arrays.
+
+    Live particles always occupy the first ``count`` slots, so updates are a
+    handful of vectorized operations over ``[:count]`` and dead particles are
+    removed by compacting the survivors to the front.
+    """
+
+    def __init__(self, capacity=8192, gravity=0.0, drag=1.0,
+                 overflow=OVERFLOW_REPLACE_OLDEST, seed=None):
+        if overflow not in overflow_policies:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.capacity = capacity
+        self.gravity = gravity
+        self.drag = drag
+        self.overflow = overflow
+        self.count = 0
+        self.dropped = 0          # Particles lost to overflow, new or replaced
+        # Particles use their own generator so effects never disturb gameplay randomness
+        self.rng = np.random.default_rng(seed)
+
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.int16)
+        self.size = np.zeros(capacity, dtype=np.int16)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.glow = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.count
+
+    def _reserve(self, n):
+        """Return the slots to write ``n`` new particles into, applying the overflow policy"""
+        free = self.capacity - self.count
+        if n <= free:
+            start = self.count
+            self.count += n
+            return np.arange(start, start + n)
+
+        if self.overflow == OVERFLOW_DROP_NEW:
+            self.dropped += n - free
+            start = self.count
+            self.count = self.capacity
+            return np.arange(start, self.capacity)
+
+        # Replace oldest: fill the free tail, then recycle the lowest-life particles.
+        # Particles beyond the capacity are never written and count as dropped too.
+        self.dropped += n - free
+        n = min(n, self.capacity)
+        recycled = n - free
+        live_life = self.life[:self.count]
+        oldest = np.argpartition(live_life, recycled - 1)[:recycled]
+        tail = np.arange(self.count, self.capacity)
+        self.count = self.capacity
+        return np.concatenate((oldest, tail))
+
+    def _write(self, slots, x, y, vx, vy, color, life, sizes, glow):
+        n = len(slots)
+        self.x[slots] = np.broadcast_to(x, n) if np.ndim(x) == 0 else x[-n:]
+        self.y[slots] = np.broadcast_to(y, n) if np.ndim(y) == 0 else y[-n:]
+        self.vx[slots] = vx[-n:]
+        self.vy[slots] = vy[-n:]
+        self.life[slots] = life
+        self.size[slots] = sizes[-n:]
+        self.color[slots] = color[:3]
+        self.glow[slots] = glow
+
+    def emit(self, x, y, color, count, speed_range=(2, 5), life=30, size_range=(2, 5), glow=False):
+        """Emit ``count`` particles radiating from (x, y) at random angles"""
+        if count <= 0:
+            return
+        rng = self.rng
+        angle = rng.uniform(0, 2 * np.pi, count)
+        speed = rng.uniform(speed_range[0], speed_range[1], count)
+        sizes = rng.integers(size_range[0], size_range[1] + 1, count)
+        slots = self._reserve(count)
+        if np.ndim(x):
+            x = np.asarray(x)
+        if np.ndim(y):
+            y = np.asarray(y)
+        self._write(slots, x, y, np.cos(angle) * speed, np.sin(angle) * speed,
+                    color, life, sizes, glow)
+
+    def scatter(self, x, y, color, count, spread=3, life=20, size_range=(3, 6), glow=False):
+        """Emit ``count`` particles from (x, y) with velocities uniform in [-spread, spread]"""
+        if count <= 0:
+            return
+        rng = self.rng
+        vx = rng.uniform(-spread, spread, count)
+        vy = rng.uniform(-spread, spread, count)
+        sizes = rng.integers(size_range[0], size_range[1] + 1, count)
+        slots = self._reserve(count)
+        self._write(slots, x, y, vx, vy, color, life, sizes, glow)
+
+    def update(self):
+        """Integrate one tick and compact away dead particles"""
+        n = self.count
+        if n == 0:
+            return
+        x, y, vx, vy = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n]
+        x += vx
+        y += vy
+        if self.gravity:
+            vy += self.gravity
+        if self.drag != 1.0:
+            vx *= self.drag
+            vy *= self.drag
+        life = self.life[:n]
+        life -= 1
+
+        alive = life > 0
+        if alive.all():
+            return
+        keep = np.flatnonzero(alive)
+        k = len(keep)
+        for arr in (self.x, self.y, self.vx, self.vy, self.life, self.size, self.color, self.glow):
+            arr[:k] = arr[keep]
+        self.count = k
+
+    def clear(self):
+        """Remove every particle"""
+        self.count = 0
+
+    def live(self):
+        """Return plain Python lists (x, y, size, life, color, glow) of the live particles for drawing"""
+        return tuple(arr.tolist() for arr in self.arrays())
+
+    def arrays(self):
+        """Return NumPy views (x, y, size, life, color, glow) of the live particles; valid until the next change"""
+        n = self.count
+        return (self.x[:n], self.y[:n], self.size[:n], self.life[:n], self.color[:n], self.glow[:n])
@@ -0,0 +1,87 @@
+class Pool:
+    """Free list of reusable entity objects.
+
+    acquire() takes a released object when there is one (creating a new one
+    only when the free list is empty) and resets it with the given values;
+    release() hands an object back. Released objects must not be used again
+    until they are acquired. ``reused`` counts the allocations avoided.
+    """
+
+    def __init__(self, cls, prefill=0):
+        self.cls = cls
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self._free = []
+        for _ in range(prefill):
+            self._free.append(cls.__new__(cls))
+            self.created += 1
+
+    def __len__(self):
+        return len(self._free)
+
+    def acquire(self, *args):
+        """An object reset with ``args``, from the free list if possible"""
+        if self._free:
+            entity = self._free.pop()
+            self.reused += 1
+        else:
+            entity = self.cls.__new__(self.cls)
+            self.created += 1
+        entity.reset(*args)
+        return entity
+
+    def release(self, entity):
+        """Hand ``entity`` back for reuse"""
+        self._free.append(entity)
+        self.released += 1
+
+    def release_all(self, entities):
+        """Hand back every object in ``entities``"""
+        self._free.extend(entities)
+        self.released += len(entities)
+
+    def stats(self):
+        """Return created/reused/released counters and the free list size"""
+        acquired = self.created + self.reused
+        return {
+            'created': self.created,
+            'reused': self.reused,
+            'released': self.released,
+            'free': len(self._free),
+            'reuse_rate': self.reused / acquired if acquired else 0.0,
+        }
+
+
+class PowerUp:
+    """A falling power-up; ``prev_x``/``prev_y`` hold its position before the last tick"""
+
+    __slots__ = ('x', 'y', 'type', 'size', 'rotation', 'pulse', 'prev_x', 'prev_y')
+
+    def reset(self, x, y, power_type, size=30, rotation=0, pulse=0):
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.type = power_type
+        self.size = size
+        self.rotation = rotation
+        self.pulse = pulse
+
+    def to_dict(self):
+        """JSON-compatible copy of the gameplay fields"""
+        return {'x': self.x, 'y': self.y, 'type': self.type, 'size': self.size,
+                'rotation': self.rotation, 'pulse': self.pulse}
+
+
+class Confetti:
+    """One piece of the victory confetti"""
+
+    __slots__ = ('x', 'y', 'color', 'speed', 'rotation', 'rotation_speed', 'size')
+
+    def reset(self, x, y, color, speed, rotation, rotation_speed, size):
+        self.x = x
+        self.y = y
+        self.color = color
+        self.speed = speed
+        self.rotation = rotation
+        self.rotation_speed = rotation_speed
+        self.size = size
@@ -0,0 +1,143 @@
+import copy
+import json
+import os
+import queue
+import threading
+
+from atomic_file import write_atomic
+from simulation import default_achievements, default_upgrades
+
+
+def merge(profile, change):
+    """Apply one journal entry to a profile dict in place"""
+    for key, value in change.items():
+        if isinstance(value, dict) and isinstance(profile.get(key), dict):
+            profile[key].update(value)
+        else:
+            profile[key] = value
+
+
+class ProfileStore:
+    """Coins, upgrades and achievements kept across sessions in an append-only journal.
+
+    Every save() appends one JSON line holding only what changed since the
+    last save; the lines are written and fsynced by a background thread.
+    Once the journal holds more than ``compact_after`` lines the thread
+    rewrites it atomically as a single snapshot line. The file is read on
+    first access (or in the background after preload()), never at import.
+    A torn last line from a crash is skipped on load.
+    """
+
+    def __init__(self, path, compact_after=200):
+        self.path = path
+        self.compact_after = compact_after
+        self.entries = 0          # Lines in the journal
+        self.compactions = 0
+        self.skipped = 0          # Unreadable lines ignored on load
+        self.error = None         # Last load or write error, if any
+        self._profile = None
+        self._saved = None
+        self._preload = None
+        self._torn = False        # The journal ends in a partial line
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def preload(self):
+        """Start reading the journal in the background"""
+        if self._profile is None and self._preload is None:
+            self._preload = threading.Thread(target=self._read, name='profile-loader', daemon=True)
+            self._preload.start()
+
+    def _read(self):
+        profile = {'coins': 0, 'upgrades': default_upgrades(), 'achievements': default_achievements()}
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    self._torn = not line.endswith('\n')
+                    try:
+                        merge(profile, json.loads(line))
+                        self.entries += 1
+                    except (ValueError, TypeError, AttributeError):
+                        self.skipped += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.error = e
+        self._saved = copy.deepcopy(profile)
+        self._profile = profile
+
+    def load(self):
+        """Return the profile dict ({'coins', 'upgrades', 'achievements'}), reading it on first use"""
+        if self._profile is None:
+            if self._preload is not None:
+                self._preload.join()
+            else:
+                self._read()
+        return self._profile
+
+    def save(self, **values):
+        """Record new values for coins/upgrades/achievements; only changes are journaled"""
+        self.load()
+        change = {}
+        for key, value in values.items():
+            saved = self._saved.get(key)
+            if isinstance(value, dict) and isinstance(saved, dict):
+                delta = {name: item for name, item in value.items() if saved.get(name) != item}
+                if delta:
+                    change[key] = delta
+            elif value != saved:
+                change[key] = value
+        if not change:
+            return False
+        change = copy.deepcopy(change)
+        if self._thread is None:
+            # The writer keeps its own copy of the journaled profile for compaction
+            self._thread = threading.Thread(target=self._write_loop, args=(copy.deepcopy(self._saved),),
+                                            name='profile-writer', daemon=True)
+            self._thread.start()
+        merge(self._saved, change)
+        merge(self._profile, change)
+        self._queue.put(change)
+        return True
+
+    def flush(self, timeout=5.0):
+        """Wait until every saved change is on disk; returns False on timeout"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _write_loop(self, profile):
+        journal = None
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            merge(profile, item)
+            try:
+                if journal is None:
+                    journal = open(self.path, 'a')
+                    if self._torn:
+                        journal.write('\n')
+                        self._torn = False
+                journal.write(json.dumps(item, separators=(',', ':')) + '\n')
+                journal.flush()
+                os.fsync(journal.fileno())
+                self.entries += 1
+                if self.entries > self.compact_after:
+                    journal.close()
+                    journal = None
+                    self._compact(profile)
+            except OSError as e:
+                self.error = e
+                if journal is not None:
+                    journal.close()
+                    journal = None
+
+    def _compact(self, profile):
+        """Replace the journal with a single snapshot line"""
+        write_atomic(self.path, json.dumps(profile, separators=(',', ':')) + '\n', prefix='.profile-')
+        self.entries = 1
+        self.compactions += 1
@@ -0,0 +1,94 @@
+import csv
+import json
+import time
+
+import numpy as np
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in fixed-size ring buffers.
+
+    Time spent in a phase is added up over the frame with lap() or add()
+    (a phase may run several times per frame, e.g. one simulation tick per
+    catch-up step), and end_frame() pushes the totals into one ring buffer
+    per phase, so the last ``history`` frames are always available for
+    percentiles or a dump.
+    """
+
+    def __init__(self, history=600):
+        self.history = history
+        self.frames = 0           # Frames recorded so far
+        self.rings = {}           # phase -> float64 ring buffer of milliseconds
+        self._current = {}
+        self._frame_start = None
+
+    def now(self):
+        return time.perf_counter()
+
+    def lap(self, phase, start):
+        """Add the time since ``start`` to ``phase``; returns the current time for the next lap"""
+        now = time.perf_counter()
+        self._current[phase] = self._current.get(phase, 0.0) + (now - start)
+        return now
+
+    def add(self, phase, seconds):
+        """Add ``seconds`` to ``phase`` for the current frame"""
+        self._current[phase] = self._current.get(phase, 0.0) + seconds
+
+    def begin_frame(self):
+        """Start a frame, discarding anything timed since the last end_frame()"""
+        self._current = {}
+        self._frame_start = time.perf_counter()
+        return self._frame_start
+
+    def end_frame(self):
+        """Close the frame and record every phase (0 for phases that did not run)"""
+        if self._frame_start is not None:
+            self._current['frame'] = time.perf_counter() - self._frame_start
+        slot = self.frames % self.history
+        for phase, seconds in self._current.items():
+            if phase not in self.rings:
+                self.rings[phase] = np.zeros(self.history, dtype=np.float64)
+        for phase, ring in self.rings.items():
+            ring[slot] = self._current.get(phase, 0.0) * 1000
+        self.frames += 1
+        self._current = {}
+        self._frame_start = None
+
+    def samples(self, phase):
+        """Recorded milliseconds for ``phase``, oldest first"""
+        ring = self.rings[phase]
+        n = min(self.frames, self.history)
+        if self.frames <= self.history:
+            return ring[:n].copy()
+        start = self.frames % self.history
+        return np.concatenate((ring[start:], ring[:start]))
+
+    def summary(self):
+        """Return {phase: {'p50', 'p99', 'max', 'mean'}} in milliseconds over the recorded frames"""
+        result = {}
+        if self.frames == 0:
+            return result
+        for phase in self.rings:
+            values = self.samples(phase)
+            p50, p99 = np.percentile(values, (50, 99))
+            result[phase] = {'p50': float(p50), 'p99': float(p99),
+                             'max': float(values.max()), 'mean': float(values.mean())}
+        return result
+
+    def dump(self, path):
+        """Write the recorded frames to ``path``: per-frame CSV for .csv, summary and samples as JSON otherwise"""
+        phases = sorted(self.rings)
+        columns = [self.samples(phase) for phase in phases]
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['frame'] + [f"{phase}_ms" for phase in phases])
+                first = self.frames - len(columns[0]) if columns else 0
+                for i, row in enumerate(zip(*columns)):
+                    writer.writerow([first + i] + [f"{value:.4f}" for value in row])
+        else:
+            with open(path, 'w') as f:
+                json.dump({'frames': self.frames, 'history': self.history, 'summary': self.summary(),
+                           'samples_ms': {phase: column.round(4).tolist()
+                                          for phase, column in zip(phases, columns)}}, f, indent=2)
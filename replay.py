@@ -0,0 +1,314 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+from simulation import GameState, Inputs, checkpoint, restore, step
+
+# Replay file layout (little endian):
+#   header   magic b'DRPL', version u8, seed u64, ticks per chunk u16, metadata length u16,
+#            metadata JSON (upgrades, achievements and coins at the start of the run)
+#   chunks   first tick u32, tick count u16, checkpoint length u32, inputs length u32,
+#            checkpoint (zlib-compressed JSON of the state before the chunk's first tick),
+#            inputs (run-length encoded: flags u8 + varint repeat count, per run)
+#   index    first tick u32 + file offset u64, per chunk
+#   footer   index offset u64, chunk count u32, tick count u32, outcome u8,
+#            final player_score i32, max_combo u32, magic b'DEND'
+# Every chunk but the last holds exactly chunk_ticks ticks, so the chunk of
+# any tick is tick // chunk_ticks and the footer sits at a fixed distance
+# from the end of the file.
+magic = b'DRPL'
+footer_magic = b'DEND'
+version = 2
+header_format = struct.Struct('<4sBQHH')
+chunk_format = struct.Struct('<IHII')
+index_format = struct.Struct('<IQ')
+footer_format = struct.Struct('<QIIBiI4s')
+
+# Input flags, one set per tick
+LEFT = 1
+RIGHT = 2
+ULTIMATE = 4
+ESCAPE = 8  # The player left the run after this tick
+
+outcomes = ('quit', 'game_over', 'victory')
+
+
+class ReplayError(Exception):
+    """Raised for files that are not valid replays"""
+
+
+def encode_runs(runs):
+    """Run-length encode [flags, count] pairs as flags byte + varint count"""
+    out = bytearray()
+    for flags, count in runs:
+        out.append(flags)
+        while count >= 0x80:
+            out.append((count & 0x7f) | 0x80)
+            count >>= 7
+        out.append(count)
+    return bytes(out)
+
+
+def decode_runs(data):
+    """Expand encode_runs() output into one flags byte per tick"""
+    ticks = bytearray()
+    i = 0
+    while i < len(data):
+        flags = data[i]
+        count = shift = 0
+        while True:
+            i += 1
+            byte = data[i]
+            count |= (byte & 0x7f) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        i += 1
+        ticks.extend(bytes((flags,)) * count)
+    return ticks
+
+
+class ReplayWriter:
+    """Streams the inputs of one run to a replay file.
+
+    Inputs are kept as runs of identical flags for the current chunk only.
+    When a chunk is full it is handed, with a checkpoint of the state at its
+    first tick, to a background thread that encodes and writes it, so the
+    game loop never waits on the disk. close() writes the chunk index and
+    the run's result.
+    """
+
+    def __init__(self, path, state, chunk_ticks=600):
+        self.path = path
+        self.state = state
+        self.chunk_ticks = chunk_ticks
+        self.ticks = 0
+        self.error = None
+        self._runs = []
+        self._chunk_start = 0
+        self._checkpoint = None
+        self._queue = queue.Queue()
+
+        meta = json.dumps({
+            'upgrades': dict(state.upgrades),
+            'achievements': dict(state.achievements),
+            'coins': state.coins,
+        }, separators=(',', ':')).encode('utf-8')
+        self._queue.put(header_format.pack(magic, version, state.seed, chunk_ticks, len(meta)) + meta)
+        self._thread = threading.Thread(target=self._write_loop, name='replay-writer', daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return self.ticks
+
+    def record(self, inputs):
+        """Add the Inputs of the next tick (call before the tick is simulated)"""
+        if self.ticks - self._chunk_start == self.chunk_ticks:
+            self._flush()
+        if not self._runs:
+            self._checkpoint = checkpoint(self.state)
+        flags = (LEFT if inputs.left else 0) | (RIGHT if inputs.right else 0) | (ULTIMATE if inputs.ultimate else 0)
+        runs = self._runs
+        if runs and runs[-1][0] == flags:
+            runs[-1][1] += 1
+        else:
+            runs.append([flags, 1])
+        self.ticks += 1
+
+    def escape(self):
+        """Mark that the player pressed ESC after the last recorded tick"""
+        runs = self._runs
+        if not runs:
+            return
+        flags, count = runs[-1]
+        if count > 1:
+            runs[-1][1] -= 1
+            runs.append([flags | ESCAPE, 1])
+        else:
+            runs[-1][0] |= ESCAPE
+
+    def _flush(self):
+        if self._runs:
+            self._queue.put((self._chunk_start, self.ticks - self._chunk_start, self._checkpoint, self._runs))
+        self._chunk_start = self.ticks
+        self._runs = []
+        self._checkpoint = None
+
+    def close(self, outcome='quit'):
+        """Finish the file with the run's result; an empty run leaves no file"""
+        self._flush()
+        state = self.state
+        self._queue.put(('end', outcome, state.player_score, state.max_combo))
+        self._thread.join()
+        if self.ticks == 0 or self.error:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def _write_loop(self):
+        index = []
+        try:
+            f = open(self.path, 'wb')
+        except OSError as e:
+            self.error = e
+            f = None
+        while True:
+            item = self._queue.get()
+            if f is None:
+                if item[0] == 'end':
+                    return
+                continue
+            try:
+                if isinstance(item, bytes):
+                    f.write(item)
+                elif item[0] == 'end':
+                    _, outcome, score, max_combo = item
+                    index_offset = f.tell()
+                    f.write(b''.join(index_format.pack(first, offset) for first, offset in index))
+                    f.write(footer_format.pack(index_offset, len(index), self.ticks, outcomes.index(outcome),
+                                               score, max_combo, footer_magic))
+                    f.close()
+                    return
+                else:
+                    first, ticks, state, runs = item
+                    saved = zlib.compress(json.dumps(state, separators=(',', ':')).encode('utf-8'))
+                    inputs = encode_runs(runs)
+                    index.append((first, f.tell()))
+                    f.write(chunk_format.pack(first, ticks, len(saved), len(inputs)))
+                    f.write(saved)
+                    f.write(inputs)
+            except OSError as e:
+                self.error = e
+                f.close()
+                f = None
+                if item[0] == 'end':
+                    return
+
+
+class Replay:
+    """A replay file opened for playback.
+
+    Only the header, the chunk index and the footer are read up front;
+    chunks are read and decoded on demand, one at a time.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                header = f.read(header_format.size)
+                file_magic, file_version, self.seed, self.chunk_ticks, meta_length = header_format.unpack(header)
+                if file_magic != magic:
+                    raise ReplayError(f"{path} is not a replay file")
+                if file_version != version:
+                    raise ReplayError(f"{path}: unsupported replay version {file_version}")
+                self.meta = json.loads(f.read(meta_length).decode('utf-8'))
+
+                f.seek(-footer_format.size, os.SEEK_END)
+                (index_offset, chunks, self.ticks, outcome, self.score, self.max_combo,
+                 end_magic) = footer_format.unpack(f.read(footer_format.size))
+                if end_magic != footer_magic:
+                    raise ReplayError(f"{path}: replay is incomplete (no chunk index)")
+                f.seek(index_offset)
+                data = f.read(chunks * index_format.size)
+                self.index = [index_format.unpack_from(data, i * index_format.size) for i in range(chunks)]
+                self.outcome = outcomes[outcome]
+            except (struct.error, ValueError, OSError, IndexError) as e:
+                raise ReplayError(f"{path}: truncated or corrupt replay ({e})")
+        self._chunk = None
+        self._chunk_number = None
+
+    def __len__(self):
+        return self.ticks
+
+    def _read_chunk(self, number):
+        """(checkpoint, flags per tick) of chunk ``number``"""
+        first, offset = self.index[number]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            try:
+                chunk_first, ticks, saved_length, inputs_length = chunk_format.unpack(f.read(chunk_format.size))
+                saved = json.loads(zlib.decompress(f.read(saved_length)).decode('utf-8'))
+                flags = decode_runs(f.read(inputs_length))
+            except (struct.error, ValueError, zlib.error, IndexError) as e:
+                raise ReplayError(f"{self.path}: corrupt chunk {number} ({e})")
+        if chunk_first != first or len(flags) != ticks:
+            raise ReplayError(f"{self.path}: corrupt chunk {number}")
+        return saved, flags
+
+    def _load_chunk(self, number):
+        if number != self._chunk_number:
+            self._chunk = self._read_chunk(number)
+            self._chunk_number = number
+        return self._chunk
+
+    def new_state(self, effects=False):
+        """A GameState at the start of the recorded run"""
+        return GameState(seed=self.seed, upgrades=dict(self.meta['upgrades']),
+                         achievements=dict(self.meta['achievements']), coins=self.meta['coins'],
+                         effects=effects)
+
+    def seek(self, tick, effects=False):
+        """(state, first tick) restored from the checkpoint of the chunk holding ``tick``"""
+        number = min(tick // self.chunk_ticks, len(self.index) - 1)
+        saved, _ = self._load_chunk(number)
+        return restore(saved, effects), self.index[number][0]
+
+    def tick_inputs(self, tick):
+        """Inputs tuple for ``tick`` (0-based)"""
+        _, flags = self._load_chunk(tick // self.chunk_ticks)
+        flags = flags[tick % self.chunk_ticks]
+        return Inputs(bool(flags & LEFT), bool(flags & RIGHT), bool(flags & ULTIMATE))
+
+
+def load(path):
+    """Open a replay file for playback"""
+    return Replay(path)
+
+
+def play(replay, profiler=None, start_tick=0):
+    """Re-simulate a replay headlessly as fast as possible.
+
+    With ``start_tick`` the run resumes from the nearest checkpoint at or
+    before that tick instead of the beginning. Returns a dict with the
+    re-simulated result, the recorded one and whether they match.
+    ``profiler`` optionally times step() phases per tick.
+    """
+    if start_tick and len(replay):
+        state, first = replay.seek(start_tick)
+    else:
+        state, first = replay.new_state(), 0
+    state.profiler = profiler
+    outcome = 'quit'
+
+    start = time.perf_counter()
+    for tick in range(first, len(replay)):
+        if profiler:
+            profiler.begin_frame()
+        result = step(state, replay.tick_inputs(tick))
+        if profiler:
+            profiler.end_frame()
+        if result in ('game_over', 'victory'):
+            outcome = result
+            break
+    elapsed = time.perf_counter() - start
+    simulated = state.tick - first
+
+    return {
+        'ticks': state.tick,
+        'from_tick': first,
+        'outcome': outcome,
+        'score': state.player_score,
+        'max_combo': state.max_combo,
+        'expected': {'ticks': len(replay), 'outcome': replay.outcome,
+                     'score': replay.score, 'max_combo': replay.max_combo},
+        'matches': (state.tick == len(replay) and outcome == replay.outcome and
+                    state.player_score == replay.score and state.max_combo == replay.max_combo),
+        'elapsed': elapsed,
+        'ticks_per_second': simulated / elapsed if elapsed > 0 else 0.0,
+    }
@@ -0,0 +1,679 @@
+"""Game logic for Dodge the Falling Blocks, independent of rendering.
+
+All mutable simulation state lives on a GameState object and is advanced
+one tick at a time by step(), so any number of games can run in one process
+and the logic can run without a display (see run_headless).
+"""
+import copy
+import json
+import math
+import random
+import time
+from collections import namedtuple
+
+import pygame
+
+from obstacles import ObstacleStore
+from pools import Pool, PowerUp
+
+# Screen dimensions
+screen_width, screen_height = 800, 600
+
+# Player setup
+player_width, player_height = 250, 150
+player_x = (screen_width - player_width) // 2
+player_y = screen_height - player_height - 10
+base_player_speed = 10
+max_lives = 3
+invulnerability_duration = 60
+
+# Default level tables
+max_levels = 5
+winning_scores = [15, 25, 40, 60, 80]
+fall_speeds = [4, 6, 8, 10, 12]
+spawn_delays = [100, 80, 60, 45, 35]
+max_blocks_per_level = [15, 25, 35, 45, 55]
+
+# Level tables a GameState can be configured with
+balance_tables = ('winning_scores', 'fall_speeds', 'spawn_delays', 'max_blocks_per_level', 'max_levels')
+
+# Power-up system
+power_up_types = ['shield', 'speed', 'slow_motion', 'multiplier', 'ultimate']
+power_up_pool = Pool(PowerUp, prefill=8)  # Shared by every GameState in the process
+power_up_spawn_delay = 600
+power_up_duration = 300
+
+# Ultimate ability system
+max_ultimate_charge = 100
+
+# Obstacle types
+obstacle_types = ['normal', 'fast', 'slow', 'bouncy', 'splitter', 'homing']
+
+# Player input for one tick
+Inputs = namedtuple('Inputs', ['left', 'right', 'ultimate'])
+no_input = Inputs(False, False, False)
+
+
+def default_upgrades():
+    return {
+        'speed': 0,
+        'lives': 0,
+        'ultimate_charge_rate': 0,
+        'coin_multiplier': 0
+    }
+
+
+def default_achievements():
+    return {
+        'first_combo_10': False,
+        'first_combo_50': False,
+        'first_boss_defeated': False,
+        'perfect_level': False,
+        'high_score_100': False
+    }
+
+
+class GameState:
+    """Complete state of one game in progress.
+
+    ``upgrades`` and ``achievements`` are shared with the caller and updated
+    in place, so progression carries over between runs. With ``effects``
+    enabled, step() appends visual effect events to ``state.effects`` for
+    the renderer to consume; headless runs leave it as None. ``profiler``
+    may be set to a FrameProfiler to time the phases of step().
+    """
+
+    __slots__ = (
+        'seed', 'rng', 'effects', 'profiler',
+        'winning_scores', 'fall_speeds', 'spawn_delays', 'max_blocks_per_level', 'max_levels',
+        'upgrades', 'achievements',
+        'tick', 'current_level', 'player_score', 'level_scores', 'player_lives', 'combo', 'max_combo',
+        'coins', 'total_score', 'bosses_faced', 'boss_kills',
+        'player_rect', 'player_speed', 'invulnerability_time',
+        'blocks', 'spawn_timer', 'fall_speed', 'spawn_delay', 'max_blocks',
+        'power_ups', 'active_power_ups', 'power_up_spawn_timer',
+        'ultimate_charge', 'ultimate_active', 'ultimate_duration', 'ultimate_cooldown',
+        'boss_active', 'boss_health', 'boss_max_health', 'boss_x', 'boss_y', 'boss_pattern', 'boss_timer',
+    )
+
+    def __init__(self, seed=None, config=None, upgrades=None, achievements=None, coins=0, effects=True):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.effects = [] if effects else None
+        self.profiler = None
+
+        self.winning_scores = list(winning_scores)
+        self.fall_speeds = list(fall_speeds)
+        self.spawn_delays = list(spawn_delays)
+        self.max_blocks_per_level = list(max_blocks_per_level)
+        self.max_levels = max_levels
+        for name, value in (config or {}).items():
+            if name not in balance_tables:
+                raise ValueError(f"Unknown balance table: {name}")
+            setattr(self, name, value if name == 'max_levels' else list(value))
+
+        self.upgrades = upgrades if upgrades is not None else default_upgrades()
+        self.achievements = achievements if achievements is not None else default_achievements()
+
+        self.tick = 0
+        self.current_level = 1
+        self.player_score = 0
+        self.level_scores = []  # Final score of every completed level
+        self.player_lives = max_lives + self.upgrades['lives']
+        self.combo = 0
+        self.max_combo = 0
+        self.coins = coins
+        self.total_score = 0
+        self.bosses_faced = 0
+        self.boss_kills = 0
+
+        self.player_rect = pygame.Rect(player_x, player_y, player_width, player_height)
+        self.player_speed = base_player_speed + self.upgrades['speed']
+        self.invulnerability_time = 0
+
+        self.ultimate_cooldown = 0
+        self.boss_x = screen_width // 2
+        self.boss_y = -100
+        self.boss_max_health = 0
+        self.boss_pattern = 0
+        self.boss_timer = 0
+        self.power_ups = []
+        reset_level(self)
+
+
+# GameState slots that checkpoint() stores specially or not at all
+checkpoint_special = ('rng', 'effects', 'profiler', 'blocks', 'player_rect', 'power_ups')
+
+
+def checkpoint(state):
+    """Copy of everything that determines how a run continues, as JSON-compatible data"""
+    data = {name: copy.deepcopy(getattr(state, name))
+            for name in GameState.__slots__ if name not in checkpoint_special}
+    version, internal, gauss_next = state.rng.getstate()
+    data['rng'] = [version, list(internal), gauss_next]
+    data['blocks'] = state.blocks.to_dict()
+    data['player_rect'] = list(state.player_rect)
+    data['power_ups'] = [power.to_dict() for power in state.power_ups]
+    return data
+
+
+def restore(data, effects=False):
+    """GameState continuing from a checkpoint() exactly as the original would"""
+    state = GameState.__new__(GameState)
+    for name in GameState.__slots__:
+        if name not in checkpoint_special:
+            setattr(state, name, copy.deepcopy(data[name]))
+    version, internal, gauss_next = data['rng']
+    state.rng = random.Random()
+    state.rng.setstate((version, tuple(internal), gauss_next))
+    state.blocks = ObstacleStore.from_dict(data['blocks'])
+    state.player_rect = pygame.Rect(data['player_rect'])
+    state.power_ups = [power_up_pool.acquire(power['x'], power['y'], power['type'], power['size'],
+                                             power['rotation'], power['pulse'])
+                       for power in data['power_ups']]
+    state.effects = [] if effects else None
+    state.profiler = None
+    return state
+
+
+def emit(state, kind, *args):
+    """Queue a visual effect event for the renderer (no-op when headless)"""
+    if state.effects is not None:
+        state.effects.append((kind, *args))
+
+
+def reset_level(state):
+    """Reset game variables for a new level"""
+    level = state.current_level - 1
+    state.blocks = ObstacleStore(obstacle_types, screen_width)
+    power_up_pool.release_all(state.power_ups)
+    state.power_ups = []
+    state.active_power_ups = {}
+    state.spawn_timer = 0
+    state.power_up_spawn_timer = 0
+    state.fall_speed = state.fall_speeds[level]
+    state.spawn_delay = state.spawn_delays[level]
+    state.max_blocks = state.max_blocks_per_level[level]
+    state.boss_active = False
+    state.boss_health = 0
+    state.ultimate_charge = 0
+    state.ultimate_active = False
+    state.ultimate_duration = 0
+    for _ in range(3):
+        create_obstacle(state)
+
+
+def advance_level(state):
+    """Move on to the next level once the target score is reached"""
+    state.current_level += 1
+    state.level_scores.append(state.player_score)
+    state.player_score = 0
+    state.player_lives = max_lives + state.upgrades['lives']
+    state.combo = 0
+    state.coins += 20
+    reset_level(state)
+
+
+def create_power_up(state):
+    """Create a random power-up"""
+    rng = state.rng
+    power_type = rng.choice(power_up_types)
+    state.power_ups.append(power_up_pool.acquire(rng.randint(50, screen_width - 50), -30, power_type))
+
+
+def update_power_ups(state):
+    """Update power-up positions and check collisions"""
+    power_ups = state.power_ups
+    player_rect = state.player_rect
+    for power in power_ups[:]:
+        power.y += 3
+        power.rotation += 2
+        power.pulse += 0.1
+
+        if power.y + power.size//2 <= player_rect.top:
+            continue  # Still above the player
+        power_rect = pygame.Rect(power.x - power.size//2, power.y - power.size//2, power.size, power.size)
+        if player_rect.colliderect(power_rect):
+            if power.type == 'ultimate':
+                state.ultimate_charge = min(max_ultimate_charge, state.ultimate_charge + 25)
+            else:
+                activate_power_up(state, power.type)
+            emit(state, 'particles', power.x, power.y, (255, 255, 0), 30, (3, 8), 'glow')
+            power_ups.remove(power)
+            power_up_pool.release(power)
+        elif power.y > screen_height + 50:
+            power_ups.remove(power)
+            power_up_pool.release(power)
+
+
+def activate_power_up(state, power_type):
+    """Activate a power-up effect"""
+    duration = power_up_duration
+
+    if power_type == 'shield':
+        state.active_power_ups['shield'] = duration
+        if state.player_lives < max_lives:
+            state.player_lives = min(max_lives, state.player_lives + 1)
+    elif power_type == 'speed':
+        state.active_power_ups['speed'] = duration
+        state.player_speed = (base_player_speed + state.upgrades['speed']) * 1.8
+    elif power_type == 'slow_motion':
+        state.active_power_ups['slow_motion'] = duration
+    elif power_type == 'multiplier':
+        state.active_power_ups['multiplier'] = duration
+
+
+def update_active_power_ups(state):
+    """Update active power-up timers"""
+    active_power_ups = state.active_power_ups
+    for power_type in list(active_power_ups):
+        active_power_ups[power_type] -= 1
+        if active_power_ups[power_type] <= 0:
+            del active_power_ups[power_type]
+            if power_type == 'speed':
+                state.player_speed = base_player_speed + state.upgrades['speed']
+
+
+def activate_ultimate(state):
+    """Activate ultimate ability"""
+    if state.ultimate_charge >= max_ultimate_charge and state.ultimate_cooldown <= 0:
+        state.ultimate_active = True
+        state.ultimate_duration = 180  # 3 seconds
+        state.ultimate_charge = 0
+        state.ultimate_cooldown = 300  # 5 second cooldown
+        # Clear all obstacles on screen with enhanced effect
+        blocks = state.blocks
+        for x, y, _, size, _ in zip(*blocks.live()):
+            emit(state, 'particles', x + size//2, y + size//2, (255, 200, 0), 40, (5, 10), 'glow')
+        blocks.clear()
+        emit(state, 'shake', 15)
+
+        # Create screen-wide flash
+        emit(state, 'flash', (255, 255, 200, 100))
+
+
+def create_obstacle(state):
+    """Spawn a random obstacle with type at the top of the screen"""
+    rng = state.rng
+    obstacle_type = rng.choice(obstacle_types)
+    state.blocks.spawn(
+        x=rng.randint(0, screen_width - 80),
+        y=-80,
+        kind=obstacle_type,
+        speed=state.fall_speeds[state.current_level - 1] + (2 if obstacle_type == 'fast' else -1 if obstacle_type == 'slow' else 0),
+        size=60 if obstacle_type == 'slow' else 80 if obstacle_type == 'fast' else 70,
+        bounce=0 if obstacle_type != 'bouncy' else rng.choice([-1, 1]),
+    )
+
+
+def create_boss(state):
+    """Create a boss for the level"""
+    state.boss_active = True
+    state.bosses_faced += 1
+    state.boss_max_health = 50 + state.current_level * 20
+    state.boss_health = state.boss_max_health
+    state.boss_x = screen_width // 2
+    state.boss_y = 50
+    state.boss_pattern = 0
+    state.boss_timer = 0
+
+
+def update_boss(state):
+    """Update boss behavior and attacks"""
+    if not state.boss_active:
+        return
+
+    state.boss_timer += 1
+    boss_timer = state.boss_timer
+
+    # Boss movement pattern
+    state.boss_x = boss_x = screen_width // 2 + math.sin(boss_timer * 0.05) * 200
+    boss_y = state.boss_y
+
+    # Boss attack patterns
+    if boss_timer % 60 == 0:  # Every second
+        blocks = state.blocks
+        # Spawn obstacles in patterns
+        if state.boss_pattern == 0:  # Spread pattern
+            for i in range(5):
+                blocks.spawn(x=boss_x + (i - 2) * 100, y=boss_y + 50, kind='fast', speed=8, size=60)
+        elif state.boss_pattern == 1:  # Circle pattern
+            for i in range(8):
+                angle = (i / 8) * 2 * math.pi
+                blocks.spawn(x=boss_x + math.cos(angle) * 100, y=boss_y + math.sin(angle) * 100,
+                             kind='normal', speed=6, size=50)
+        state.boss_pattern = (state.boss_pattern + 1) % 2
+
+
+def check_achievements(state):
+    """Check and unlock achievements"""
+    achievements = state.achievements
+
+    if state.combo >= 10 and not achievements['first_combo_10']:
+        achievements['first_combo_10'] = True
+        state.coins += 10
+        emit(state, 'achievement', 'first_combo_10')
+
+    if state.combo >= 50 and not achievements['first_combo_50']:
+        achievements['first_combo_50'] = True
+        state.coins += 50
+        emit(state, 'achievement', 'first_combo_50')
+
+    if state.boss_active and state.boss_health <= 0 and not achievements['first_boss_defeated']:
+        achievements['first_boss_defeated'] = True
+        state.coins += 100
+        emit(state, 'achievement', 'first_boss_defeated')
+
+    if state.player_score >= 100 and not achievements['high_score_100']:
+        achievements['high_score_100'] = True
+        state.coins += 25
+        emit(state, 'achievement', 'high_score_100')
+
+
+def step(state, inputs):
+    """Advance the game logic by one tick.
+
+    ``inputs`` is an Inputs tuple for this tick. Returns None while the level
+    is in progress, or 'level_complete', 'game_over' or 'victory' when the
+    run reaches one of those points.
+    """
+    s = state
+    s.tick += 1
+    prof = s.profiler
+    t = prof.now() if prof else None
+    if inputs.ultimate:
+        activate_ultimate(s)
+
+    player_rect = s.player_rect
+    active_power_ups = s.active_power_ups
+    upgrades = s.upgrades
+
+    # Handle player movement
+    move_speed = (s.player_speed + upgrades['speed']) * (0.5 if 'slow_motion' in active_power_ups else 1.0)
+
+    if inputs.left and player_rect.x > 0:
+        player_rect.x -= move_speed
+    if inputs.right and player_rect.x < screen_width - player_width:
+        player_rect.x += move_speed
+
+    # Update systems
+    if s.invulnerability_time > 0:
+        s.invulnerability_time -= 1
+
+    if s.ultimate_active:
+        s.ultimate_duration -= 1
+        if s.ultimate_duration <= 0:
+            s.ultimate_active = False
+
+    if s.ultimate_cooldown > 0:
+        s.ultimate_cooldown -= 1
+
+    # Charge ultimate
+    if not s.ultimate_active and s.ultimate_charge < max_ultimate_charge:
+        charge_rate = 0.1 + upgrades['ultimate_charge_rate'] * 0.05
+        s.ultimate_charge = min(max_ultimate_charge, s.ultimate_charge + charge_rate)
+
+    # Game logic
+    s.spawn_timer += 1
+    s.power_up_spawn_timer += 1
+    if prof:
+        t = prof.lap('player', t)
+
+    # Boss logic
+    if s.boss_active:
+        update_boss(s)
+    elif s.player_score >= s.winning_scores[s.current_level - 1] * 0.8:
+        create_boss(s)
+    if prof:
+        t = prof.lap('boss', t)
+
+    # Spawn obstacles (unless boss is active)
+    if not s.boss_active and s.spawn_timer >= s.spawn_delay:
+        create_obstacle(s)
+        s.spawn_timer = 0
+
+    # Spawn power-ups
+    if s.power_up_spawn_timer >= power_up_spawn_delay:
+        if s.rng.random() < 0.3:
+            create_power_up(s)
+        s.power_up_spawn_timer = 0
+    if prof:
+        t = prof.lap('spawning', t)
+
+    # Update power-ups
+    update_power_ups(s)
+    update_active_power_ups(s)
+    if prof:
+        t = prof.lap('power_ups', t)
+
+    # Remove obstacles off screen
+    blocks = s.blocks
+    blocks.remove_below(screen_height + 100)
+
+    if blocks.count > s.max_blocks:
+        blocks.remove(blocks.oldest())
+
+    # Calculate fall speed
+    speed_multiplier = 0.5 if 'slow_motion' in active_power_ups else 1.0
+    if s.ultimate_active:
+        speed_multiplier *= 0.3  # Ultimate slows everything
+    current_fall_speed_multiplier = speed_multiplier * (1 + min(s.player_score * 0.02, 0.5))
+
+    # Update obstacle positions
+    landed = blocks.update(current_fall_speed_multiplier, player_rect, screen_height)
+    if prof:
+        t = prof.lap('obstacles', t)
+
+    # Check collisions: only blocks that hit the player or left the screen need
+    # handling, in spawn order
+    removed = []
+    for slot, hit in landed:
+        x = float(blocks.x[slot])
+        y = float(blocks.y[slot])
+        size = int(blocks.size[slot])
+
+        if y >= screen_height:
+            if not hit:
+                score_gain = 1
+                if 'multiplier' in active_power_ups:
+                    score_gain = 2
+                score_gain += upgrades['coin_multiplier']
+                s.player_score += score_gain
+                s.coins += score_gain
+                s.combo += 1
+                s.max_combo = max(s.max_combo, s.combo)
+                emit(s, 'combo')
+                check_achievements(s)
+                emit(s, 'particles', x + size//2, y + size//2, (100, 255, 100), 10, (3, 7), 'glow')
+            removed.append(slot)
+
+        if hit and s.invulnerability_time <= 0 and not s.ultimate_active:
+            if 'shield' in active_power_ups:
+                del active_power_ups['shield']
+                emit(s, 'particles', x + size//2, y + size//2, (100, 200, 255), 25, (4, 8), 'glow')
+            else:
+                emit(s, 'hit')
+                s.player_lives -= 1
+                s.combo = 0
+                s.invulnerability_time = invulnerability_duration
+                emit(s, 'shake', 8)
+                emit(s, 'particles', x + size//2, y + size//2, (255, 100, 100), 30, (5, 10), 'glow')
+
+                if s.player_lives <= 0:
+                    blocks.remove_many(removed)
+                    s.total_score = s.player_score
+                    return 'game_over'
+
+            removed.append(slot)
+    if removed:
+        blocks.remove_many(removed)
+    if prof:
+        t = prof.lap('collisions', t)
+
+    # Boss collision and damage
+    if s.boss_active:
+        boss_rect = pygame.Rect(s.boss_x - 60, s.boss_y - 60, 120, 120)
+        if player_rect.colliderect(boss_rect) and s.invulnerability_time <= 0:
+            if 'shield' not in active_power_ups:
+                s.player_lives -= 1
+                s.invulnerability_time = invulnerability_duration
+                emit(s, 'shake', 10)
+
+        # Boss takes damage over time (survive long enough to win)
+        if s.tick % 30 == 0:  # Every 0.5 seconds
+            s.boss_health -= 1
+
+        # Boss takes extra damage from ultimate
+        if s.ultimate_active:
+            s.boss_health -= 2
+
+        # Check if boss is defeated
+        if s.boss_health <= 0:
+            s.boss_active = False
+            s.boss_kills += 1
+            s.coins += 50 + s.current_level * 10
+            s.player_score += 20  # Bonus for defeating boss
+            # Massive explosion effect and victory flash
+            emit(s, 'boss_defeated', s.boss_x, s.boss_y)
+            emit(s, 'shake', 20)
+            check_achievements(s)
+            emit(s, 'flash', (255, 255, 100, 150))
+    if prof:
+        prof.lap('boss', t)
+
+    # Check level completion
+    if s.player_score >= s.winning_scores[s.current_level - 1] and not s.boss_active:
+        if s.current_level < s.max_levels:
+            advance_level(s)
+            return 'level_complete'
+        s.total_score = s.player_score
+        return 'victory'
+
+    return None
+
+
+def autopilot(state):
+    """Simple dodging policy for headless runs.
+
+    Steers away from the lowest block about to land on the player and fires
+    the ultimate when it is charged and that block is close.
+    """
+    player_rect = state.player_rect
+    blocks = state.blocks
+    # Lowest block above the player and within reach, the oldest one on ties
+    threat = blocks.lowest_in(player_rect.left - 20, player_rect.top - 250, player_rect.right + 20,
+                              player_rect.bottom)
+    if threat is None:
+        return no_input
+    threat_x, threat_y, threat_size = float(blocks.x[threat]), float(blocks.y[threat]), int(blocks.size[threat])
+
+    # Dodge away from the block, unless already pressed against that wall
+    go_left = threat_x + threat_size / 2 > player_rect.centerx
+    if go_left and player_rect.left <= 0:
+        go_left = False
+    elif not go_left and player_rect.right >= screen_width:
+        go_left = True
+    use_ultimate = state.ultimate_charge >= max_ultimate_charge and threat_y > player_rect.top - 100
+    return Inputs(go_left, not go_left, use_ultimate)
+
+
+def run_headless(seed=0, max_ticks=60 * 60 * 30, policy=autopilot, config=None, upgrades=None):
+    """Play one game with rendering skipped, as fast as the CPU allows.
+
+    ``config`` optionally overrides the level tables named in balance_tables.
+    The run ends on game over, victory or after ``max_ticks`` ticks.
+    Returns a dict of run statistics including ticks per second.
+    """
+    state = GameState(seed=seed, config=config, upgrades=upgrades, effects=False)
+    outcome = None
+
+    start = time.perf_counter()
+    while state.tick < max_ticks:
+        outcome = step(state, policy(state))
+        if outcome in ('game_over', 'victory'):
+            break
+    elapsed = time.perf_counter() - start
+    ticks = state.tick
+
+    return {
+        'seed': seed,
+        'outcome': outcome if outcome in ('game_over', 'victory') else 'timeout',
+        'ticks': ticks,
+        'level': state.current_level,
+        'score': state.player_score,
+        'max_combo': state.max_combo,
+        'coins': state.coins,
+        'bosses_faced': state.bosses_faced,
+        'boss_kills': state.boss_kills,
+        'elapsed': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def headless_main(argv=None):
+    """Command line entry point for ``game.py --headless``"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Run seeded games without rendering")
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--ticks', type=int, default=60 * 60 * 30, help="tick limit per run")
+    parser.add_argument('--config', help="JSON file overriding the level tables")
+    parser.add_argument('--replay', help="re-simulate a recorded replay file and verify its result")
+    parser.add_argument('--profile-out', help="with --replay, write per-tick step() timings (.csv or .json)")
+    parser.add_argument('--from-tick', type=int, default=0,
+                        help="with --replay, resume from the checkpoint at or before this tick")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        return replay_main(args.replay, args.profile_out, args.from_tick)
+
+    config = None
+    if args.config:
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+
+    total_ticks = 0
+    total_elapsed = 0.0
+    for i in range(args.runs):
+        stats = run_headless(seed=args.seed + i, max_ticks=args.ticks, config=config)
+        total_ticks += stats['ticks']
+        total_elapsed += stats['elapsed']
+        print(f"seed {stats['seed']}: {stats['outcome']} at level {stats['level']}, "
+              f"score {stats['score']}, max combo {stats['max_combo']}, "
+              f"{stats['ticks']} ticks ({stats['ticks_per_second']:.0f} ticks/s)")
+    if total_elapsed > 0:
+        print(f"{total_ticks} ticks in {total_elapsed:.2f}s: {total_ticks / total_elapsed:.0f} ticks/s")
+
+
+def replay_main(path, profile_out=None, from_tick=0):
+    """Re-simulate a replay file and exit with status 1 if its result does not match"""
+    import sys
+    from replay import ReplayError, load, play
+    profiler = None
+    if profile_out:
+        from profiler import FrameProfiler
+        profiler = FrameProfiler()
+    try:
+        replay = load(path)
+    except (OSError, ReplayError) as e:
+        sys.exit(f"Cannot load replay: {e}")
+    try:
+        result = play(replay, profiler, from_tick)
+    except ReplayError as e:
+        sys.exit(f"Cannot play replay: {e}")
+    expected = result['expected']
+    print(f"{path}: seed {replay.seed}, ticks {result['from_tick']}-{result['ticks']} "
+          f"({result['ticks_per_second']:.0f} ticks/s)")
+    print(f"  replayed: {result['outcome']}, score {result['score']}, max combo {result['max_combo']}")
+    print(f"  recorded: {expected['outcome']}, score {expected['score']}, max combo {expected['max_combo']}")
+    if profiler:
+        profiler.dump(profile_out)
+    if not result['matches']:
+        print("  MISMATCH: the replay diverged from the recorded run")
+        sys.exit(1)
+    print("  OK")
+
+
+if __name__ == '__main__':
+    headless_main()
@@ -0,0 +1,146 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+
+
+class SpriteCache:
+    """LRU cache of pre-rendered sprites (glows, halos, hexagons, rotated images).
+
+    Sprites are keyed on their shape, radius, color and alpha, with the alpha
+    quantized to ``alpha_step`` so slowly fading effects reuse a small set of
+    surfaces instead of allocating a new one on every draw.
+    """
+
+    def __init__(self, max_entries=1024, alpha_step=8, angle_step=6):
+        self.max_entries = max_entries
+        self.alpha_step = alpha_step
+        self.angle_step = angle_step
+        self._sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._sprites)
+
+    def quantize_alpha(self, alpha):
+        """Snap an alpha value to the cache's alpha grid"""
+        step = self.alpha_step
+        return max(0, min(255, int(round(alpha / step)) * step))
+
+    def _lookup(self, key, render):
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self._sprites.move_to_end(key)
+            return sprite
+        self.misses += 1
+        sprite = render()
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+            self.evictions += 1
+        return sprite
+
+    def circle(self, radius, color, alpha):
+        """Filled circle of ``radius`` on a (2r x 2r) surface; blit at (cx - r, cy - r)"""
+        radius = int(radius)
+        color = tuple(color[:3])
+        alpha = self.quantize_alpha(alpha)
+
+        def render():
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (*color, alpha), (radius, radius), radius)
+            return surface
+
+        return self._lookup(('circle', radius, color, alpha), render)
+
+    def circles(self, radii, colors, alphas):
+        """circle() for arrays of radii, (n x 3) colors and alphas; returns a list of sprites.
+
+        Each distinct sprite is looked up once, so thousands of particles
+        cost a handful of lookups; the other ones are counted as hits.
+        """
+        step = self.alpha_step
+        colors = np.asarray(colors)
+        keys = np.asarray(radii, dtype=np.int64) << 32
+        keys |= colors[:, 0].astype(np.int64) << 24
+        keys |= colors[:, 1].astype(np.int64) << 16
+        keys |= colors[:, 2].astype(np.int64) << 8
+        keys |= np.clip(np.round(np.asarray(alphas) / step) * step, 0, 255).astype(np.int64)
+        unique, inverse = np.unique(keys, return_inverse=True)
+        sprites = [self.circle(key >> 32, (key >> 24 & 255, key >> 16 & 255, key >> 8 & 255), key & 255)
+                   for key in unique.tolist()]
+        self.hits += len(keys) - len(unique)
+        return [sprites[i] for i in inverse.tolist()]
+
+    def square(self, size, color, alpha):
+        """Filled (size x size) square; blit at its top-left corner"""
+        size = int(size)
+        color = tuple(color[:3])
+        alpha = self.quantize_alpha(alpha)
+
+        def render():
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            surface.fill((*color, alpha))
+            return surface
+
+        return self._lookup(('square', size, color, alpha), render)
+
+    def hexagon(self, radius, color, alpha, rotation=0):
+        """Filled hexagon with circumradius ``radius``, centred on a square surface.
+
+        Blit at (cx - w // 2, cy - h // 2). Rotation is in degrees; hexagons
+        repeat every 60 degrees so only ``60 / angle_step`` orientations exist.
+        """
+        color = tuple(color[:3])
+        alpha = self.quantize_alpha(alpha)
+        step = self.angle_step
+        rotation = int(rotation // step * step) % 60
+
+        def render():
+            side = 2 * math.ceil(radius) + 2
+            center = side / 2
+            points = []
+            for i in range(6):
+                angle = (rotation + i * 60) * math.pi / 180
+                points.append((center + math.cos(angle) * radius, center + math.sin(angle) * radius))
+            surface = pygame.Surface((side, side), pygame.SRCALPHA)
+            pygame.draw.polygon(surface, (*color, alpha), points)
+            return surface
+
+        return self._lookup(('hexagon', radius, color, alpha, rotation), render)
+
+    def rotated(self, name, image, size, angle):
+        """``image`` scaled to (size x size) and rotated by ``angle`` degrees.
+
+        The angle is snapped to ``angle_step``. Rotation grows the surface, so
+        blit centred on the object: (cx - w // 2, cy - h // 2). ``name``
+        identifies the source image in the cache key.
+        """
+        size = int(size)
+        step = self.angle_step
+        angle = int(angle // step * step) % 360
+
+        def render():
+            base = image if image.get_size() == (size, size) else pygame.transform.smoothscale(image, (size, size))
+            return pygame.transform.rotate(base, angle)
+
+        return self._lookup(('rotated', name, size, angle), render)
+
+    def clear(self):
+        """Drop every cached sprite (counters are kept)"""
+        self._sprites.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current cache size"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._sprites),
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
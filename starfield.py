@@ -0,0 +1,96 @@
+import numpy as np
+import pygame
+
+min_brightness = 100
+twinkle_amplitude = 20
+pixel_dx = np.array([0, 1, 0, 1])
+pixel_dy = np.array([0, 0, 1, 1])
+
+
+class Starfield:
+    """Parallax background stars stored as NumPy arrays.
+
+    Scrolling, wrapping and the twinkle are a few vectorized operations per
+    frame. The smallest stars are 2x2 pixel squares written straight into
+    the surface through surfarray; every larger star is one blit of a
+    sprite from a table baked up front for each size and brightness (glow
+    included), so thousands of stars stay cheap.
+    """
+
+    def __init__(self, count, width, height, max_size=3, layers=3, seed=None):
+        self.count = count
+        self.width = width
+        self.height = height
+        self.max_size = max_size
+        # Stars use their own generator so they never disturb gameplay randomness
+        self.rng = np.random.default_rng(seed)
+        self.x = self.rng.integers(0, width, count, endpoint=True).astype(np.int32)
+        self.y = self.rng.integers(0, height, count, endpoint=True).astype(np.float64)
+        self.speed = self.rng.uniform(0.5, 2, count)
+        self.size = self.rng.integers(1, max_size, count, endpoint=True).astype(np.int32)
+        layer = self.rng.integers(1, layers, count, endpoint=True)
+        self.brightness = np.minimum(255, 150 + layer * 50).astype(np.int32)
+        self._pixel = np.flatnonzero(self.size == 1)
+        self._sprite = np.flatnonzero(self.size > 1)
+        self._bake()
+
+    def __len__(self):
+        return self.count
+
+    def _bake(self):
+        """One sprite per (size, brightness) for the glowing sizes, with its offset from the star's center"""
+        self._sprites = []
+        offsets = []
+        for size in range(2, self.max_size + 1):
+            radius = int(size * 1.5)
+            for brightness in range(min_brightness, 256):
+                color = (brightness, brightness, brightness)
+                # Glow drawn on its own surface and blitted, as it used to be onto the screen
+                glow = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(glow, (*color, brightness // 3), (radius, radius), radius)
+                sprite = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+                sprite.blit(glow, (0, 0))
+                pygame.draw.circle(sprite, color, (radius, radius), size)
+                self._sprites.append(sprite)
+            offsets.append(radius)
+        self._offsets = np.array(offsets, dtype=np.int32)
+
+    def update(self, speed_scale=1.0):
+        """Scroll every star down; stars leaving the bottom reappear at the top"""
+        self.y += self.speed * speed_scale
+        wrapped = np.flatnonzero(self.y > self.height)
+        if len(wrapped):
+            self.y[wrapped] = 0
+            self.x[wrapped] = self.rng.integers(0, self.width, len(wrapped), endpoint=True)
+
+    def draw(self, surface, time):
+        """Draw the twinkling stars at ``time`` (in ticks); returns the areas drawn"""
+        x = self.x
+        y = self.y.astype(np.int32)
+        twinkle = (twinkle_amplitude * np.sin(time * 0.05 + x * 0.01 + self.y * 0.01)).astype(np.int32)
+        brightness = np.clip(self.brightness + twinkle, min_brightness, 255)
+        return self._draw_pixels(surface, x, y, brightness) + self._draw_sprites(surface, x, y, brightness)
+
+    def _draw_pixels(self, surface, x, y, brightness):
+        """Size 1 stars: the 2x2 square pygame.draw.circle gives for radius 1"""
+        stars = self._pixel
+        left = x[stars] - 1
+        top = y[stars] - 1
+        px = (left[:, None] + pixel_dx).ravel()
+        py = (top[:, None] + pixel_dy).ravel()
+        width, height = surface.get_size()
+        inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+        pixels = pygame.surfarray.pixels3d(surface)
+        pixels[px[inside], py[inside]] = np.repeat(brightness[stars], 4)[inside, None]
+        del pixels
+        return [pygame.Rect(l, t, 2, 2) for l, t in zip(left.tolist(), top.tolist())]
+
+    def _draw_sprites(self, surface, x, y, brightness):
+        stars = self._sprite
+        size = self.size[stars]
+        index = (size - 2) * (256 - min_brightness) + brightness[stars] - min_brightness
+        offset = self._offsets[size - 2]
+        left = (x[stars] - offset).tolist()
+        top = (y[stars] - offset).tolist()
+        sprites = self._sprites
+        return surface.blits([(sprites[i], (l, t)) for i, l, t in zip(index.tolist(), left, top)])
@@ -0,0 +1,100 @@
+import numpy as np
+import pygame
+
+
+class PlayerTrail:
+    """Fading trail of the player's recent positions.
+
+    Positions live in a fixed-size ring buffer: push() overwrites the oldest
+    one, nothing is allocated or removed per tick. An entry's age sets its
+    life (``length - 1`` for the newest down to 1), and the sprite for every
+    life is baked once: with the player image, the two faded copies the
+    trail used to draw (alpha/4 and alpha/2) are composited into a single
+    sprite, so an entry costs one blit from a cached surface. Sprites are
+    re-baked only when the image changes.
+    """
+
+    def __init__(self, length=15, color=(0, 255, 0)):
+        self.length = length
+        self.capacity = length - 1
+        self.color = color
+        self.x = [0] * self.capacity
+        self.y = [0] * self.capacity
+        self.head = 0             # Slot the next position goes into
+        self.count = 0
+        self.bakes = 0
+        self._image = None
+        self._sprites = None      # life -> [(surface, dx, dy), ...]
+
+    def __len__(self):
+        return self.count
+
+    def push(self, x, y):
+        """Add the newest position, dropping the oldest one when full"""
+        self.x[self.head] = x
+        self.y[self.head] = y
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def clear(self):
+        self.count = 0
+
+    def set_image(self, image):
+        """Use ``image`` (or the circle fallback for None) for the trail sprites"""
+        if image is not self._image or self._sprites is None:
+            self._image = image
+            self._bake()
+
+    def _alpha(self, life):
+        return int(255 * (life / self.length))
+
+    def _bake(self):
+        self._sprites = {}
+        for life in range(1, self.length):
+            alpha = self._alpha(life)
+            if self._image is not None:
+                self._sprites[life] = [self._bake_image(alpha // 4, alpha // 2)]
+            else:
+                self._sprites[life] = self._bake_circles(life, alpha)
+        self.bakes += 1
+
+    def _bake_image(self, ghost_alpha, main_alpha):
+        """The image drawn twice at the same spot with the two surface alphas, as one sprite.
+
+        Blitting a pixel of alpha p with surface alpha a leaves (1 - p*a) of
+        the background, so two copies leave (1 - p*a1)(1 - p*a2): one sprite
+        with that complement as its alpha gives the same result.
+        """
+        image = self._image
+        sprite = image.copy()
+        p = pygame.surfarray.array_alpha(image) / 255.0
+        keep = (1 - p * (ghost_alpha / 255.0)) * (1 - p * (main_alpha / 255.0))
+        pygame.surfarray.pixels_alpha(sprite)[:] = np.rint((1 - keep) * 255).astype(np.uint8)
+        width, height = image.get_size()
+        return sprite, -(width // 2), -(height // 2)
+
+    def _bake_circles(self, life, alpha):
+        """Glow circle plus solid circle, as drawn without a player image"""
+        size = int(20 * (life / self.length))
+        glow_size = size * 1.5
+        glow_radius = int(glow_size)
+        glow = pygame.Surface((int(glow_size * 2), int(glow_size * 2)), pygame.SRCALPHA)
+        pygame.draw.circle(glow, (*self.color, alpha // 4), (glow_radius, glow_radius), glow_radius)
+        dot = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(dot, (*self.color, alpha), (size, size), size)
+        return [(glow, -glow_radius, -glow_radius), (dot, -size, -size)]
+
+    def draw(self, surface):
+        """Draw the trail, oldest entry first"""
+        if self._sprites is None:
+            self._bake()
+        sprites = self._sprites
+        capacity = self.capacity
+        blits = []
+        for age in range(self.count - 1, -1, -1):
+            slot = (self.head - 1 - age) % capacity
+            x = int(self.x[slot])
+            y = int(self.y[slot])
+            for sprite, dx, dy in sprites[capacity - age]:
+                blits.append((sprite, (x + dx, y + dy)))
+        surface.blits(blits, False)
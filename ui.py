@@ -0,0 +1,229 @@
+import numpy as np
+import pygame
+
+from sprite_cache import SpriteCache
+
+unset = object()  # Value of a HUD widget that has not been rendered yet
+
+
+class GradientBar:
+    """Horizontal gradient bar pre-rendered at full width.
+
+    Drawing blits only the filled part of the cached surface, and the
+    gradient is re-rendered only when its colors change.
+    """
+
+    def __init__(self, width, height, start, end):
+        self.width = width
+        self.height = height
+        self.colors = None
+        self.surface = pygame.Surface((width, height))
+        self.renders = 0
+        self.set_colors(start, end)
+
+    def set_colors(self, start, end):
+        """Change the gradient end colors (a no-op if they are unchanged)"""
+        colors = (tuple(start), tuple(end))
+        if colors == self.colors:
+            return
+        self.colors = colors
+        ratio = np.arange(self.width) / self.width
+        start = np.array(start, dtype=np.float64)
+        end = np.array(end, dtype=np.float64)
+        column = (start + (end - start) * ratio[:, None]).astype(np.uint8)
+        pygame.surfarray.blit_array(self.surface, np.repeat(column[:, None, :], self.height, axis=1))
+        self.renders += 1
+
+    def draw(self, surface, x, y, fill_width):
+        """Blit the first ``fill_width`` pixels of the bar at (x, y)"""
+        fill_width = min(int(fill_width), self.width)
+        if fill_width > 0:
+            surface.blit(self.surface, (x, y), (0, 0, fill_width, self.height))
+
+
+class TextCache(SpriteCache):
+    """Fonts by size plus an LRU cache of rendered (antialiased) text surfaces.
+
+    HUD and menu strings rarely change between frames, so rendering them is
+    mostly a dictionary lookup. Fonts for ``sizes`` are loaded up front and
+    any other size is loaded once on first use. The LRU and its counters
+    are SpriteCache's, keyed on the text instead of a shape.
+    """
+
+    def __init__(self, font_name=None, sizes=(), max_entries=512):
+        super().__init__(max_entries)
+        self.font_name = font_name
+        self.fonts = {}
+        for size in sizes:
+            self.font(size)
+
+    def font(self, size):
+        """Return the font for ``size``, loading it on first use"""
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(self.font_name, size)
+        return font
+
+    def render(self, size, text, color):
+        """Rendered surface for ``text`` at ``size`` in ``color``"""
+        color = tuple(color)
+        return self._lookup(('text', size, text, color), lambda: self.font(size).render(text, True, color))
+
+    def stats(self):
+        """Return hit/miss counters, the current cache size and the fonts loaded"""
+        stats = super().stats()
+        stats['fonts'] = len(self.fonts)
+        return stats
+
+
+class DirtyRectRenderer:
+    """Partial screen updates over a cached static layer.
+
+    The static layer (background plus everything that does not move) is
+    drawn once. Each frame begin() restores it under the areas the moving
+    elements covered last frame, the moving elements are drawn and reported
+    with blit()/mark(), and present() sends only the old and new areas to
+    the display with pygame.display.update(rects).
+    """
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.static = screen.copy()
+        self._dirty = []
+        self._previous = []
+        self._full = True
+        self.full_updates = 0
+        self.partial_updates = 0
+
+    def set_static(self, draw):
+        """Redraw the static layer with ``draw(surface)``; the next frame is a full update"""
+        draw(self.static)
+        self._full = True
+
+    def begin(self):
+        """Erase last frame's moving elements by restoring the static layer under them"""
+        screen = self.screen
+        if self._full:
+            screen.blit(self.static, (0, 0))
+        else:
+            static = self.static
+            screen.blits([(static, rect, rect) for rect in self._previous], False)
+
+    def blit(self, surface, pos):
+        """Blit a moving element and record its area"""
+        rect = self.screen.blit(surface, pos)
+        self._dirty.append(rect)
+        return rect
+
+    def mark(self, rects):
+        """Record areas already drawn to the screen"""
+        self._dirty.extend(rects)
+
+    def present(self):
+        """Push this frame's changes to the display"""
+        if self._full:
+            pygame.display.flip()
+            self.full_updates += 1
+        else:
+            pygame.display.update(self._previous + self._dirty)
+            self.partial_updates += 1
+        self._previous = self._dirty
+        self._dirty = []
+        self._full = False
+
+
+def merge_rects(rects):
+    """Replace overlapping rects by their unions, so no area is covered twice"""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class Hud:
+    """Retained-mode HUD: widgets composited onto one cached surface.
+
+    Each widget is bound to a function returning its current value and a
+    function rendering that value. A widget is re-rendered only when its
+    value changes, and the HUD surface is recomposed only when a widget
+    was; otherwise drawing the HUD is a blit of the cached surface under
+    each widget. Widgets are kept and composited with premultiplied
+    alpha, so overlapping translucent layers (text glows) look exactly as
+    if they were blitted straight onto the screen.
+    """
+
+    def __init__(self, size):
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self.widgets = []
+        self.regions = []         # Areas of the HUD surface holding widgets
+        self.renders = 0          # Widget renders
+        self.composites = 0       # Times the HUD surface was rebuilt
+
+    def add(self, value, render, pos, anchor='left'):
+        """Add a widget showing ``render(value())`` at ``pos``.
+
+        ``render`` returns a surface, a list of (surface, (dx, dy)) layers
+        drawn in order, or None to hide the widget. With ``anchor='right'``
+        the x of ``pos`` is the distance from the right edge. Widgets are
+        composited in the order they are added.
+        """
+        self.widgets.append({'value': value, 'render': render, 'pos': pos, 'anchor': anchor,
+                             'current': unset, 'layers': [], 'width': 0})
+
+    def update(self):
+        """Re-render widgets whose value changed; returns True if the HUD surface was rebuilt"""
+        changed = False
+        for widget in self.widgets:
+            value = widget['value']()
+            if value != widget['current']:
+                widget['current'] = value
+                self._render(widget, widget['render'](value))
+                changed = True
+        if changed:
+            self._composite()
+        return changed
+
+    def _render(self, widget, rendered):
+        if rendered is None:
+            rendered = []
+        elif isinstance(rendered, pygame.Surface):
+            rendered = [(rendered, (0, 0))]
+        widget['layers'] = [(surface.convert_alpha().premul_alpha(), offset) for surface, offset in rendered]
+        widget['width'] = max((surface.get_width() + offset[0] for surface, offset in rendered), default=0)
+        self.renders += 1
+
+    def _composite(self):
+        surface = self.surface
+        width = surface.get_width()
+        for region in self.regions:
+            surface.fill((0, 0, 0, 0), region)
+        regions = []
+        for widget in self.widgets:
+            x, y = widget['pos']
+            if widget['anchor'] == 'right':
+                x = width - widget['width'] - x
+            rects = [surface.blit(layer, (x + dx, y + dy), special_flags=pygame.BLEND_PREMULTIPLIED)
+                     for layer, (dx, dy) in widget['layers']]
+            if rects:
+                regions.append(rects[0].unionall(rects[1:]))
+        self.regions = merge_rects(regions)
+        self.composites += 1
+
+    def draw(self, target):
+        """Bring the widgets up to date and blit the HUD; returns the areas drawn"""
+        self.update()
+        return target.blits([(self.surface, region, region, pygame.BLEND_PREMULTIPLIED) for region in self.regions])
+
+    def invalidate(self):
+        """Re-render every widget on the next draw"""
+        for widget in self.widgets:
+            widget['current'] = unset
+
+    def stats(self):
+        """Return render/composite counters"""
+        return {'widgets': len(self.widgets), 'renders': self.renders, 'composites': self.composites}